@@ -1,14 +1,25 @@
 import time
+from contextlib import asynccontextmanager
+from typing import List
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
 
-from .models.schemas import DirectExecutionRequest, DirectExecutionResponse
-from .simulator.simulate import record_and_replay
+from .models.schemas import DirectExecutionRequest, DirectExecutionResponse, UserJourneyPath
+from .simulator.simulate import record_and_replay, simulator
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Close the simulator's shared replay HTTP session and recording browser on shutdown"""
+    yield
+    await simulator.close()
 
 app = FastAPI(
     title="Pendo Data Generation API", 
     description="Streamlined API for validating and executing Pendo workflow simulations",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware for frontend integration
@@ -20,6 +31,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Dumps validated journey paths to plain dicts in a single pydantic-core call
+user_journey_paths_adapter = TypeAdapter(List[UserJourneyPath])
+
 @app.get("/")
 async def root():
     """Root endpoint - also serves as a health check"""
@@ -49,7 +63,11 @@ async def health_check():
         "version": "2.0.0"
     }
 
-@app.post("/execute_workflow", response_model=DirectExecutionResponse)
+@app.post(
+    "/execute_workflow",
+    response_class=ORJSONResponse,
+    responses={200: {"model": DirectExecutionResponse}}  # Documents the schema without re-validating
+)
 async def execute_workflow(request: DirectExecutionRequest):
     """
     Single endpoint to validate and execute Pendo workflow simulations.
@@ -61,15 +79,15 @@ async def execute_workflow(request: DirectExecutionRequest):
     No database dependencies - completely stateless operation.
     """
     
-    start_time = time.time()
+    start_time = time.monotonic()
     
     try:
         workflow_data = request.workflow_json
         
         # Extract workflow information
         workflow_name = workflow_data.workflow_name
-        app_url = str(request.app_url)
-        user_journey_paths = [path.dict() for path in workflow_data.user_journey_paths]
+        app_url = request.app_url
+        user_journey_paths = user_journey_paths_adapter.dump_python(workflow_data.user_journey_paths)
         
         # Extract user segments and accounts if present
         user_segments = None
@@ -98,26 +116,27 @@ async def execute_workflow(request: DirectExecutionRequest):
             accounts=accounts
         )
         
-        execution_time = time.time() - start_time
+        execution_time = time.monotonic() - start_time
         
-        if result and result.get('success', False):
-            response = DirectExecutionResponse(
+        # Responses are server-authored, so they are built with model_construct (no validation)
+        if result and result.success:
+            response = DirectExecutionResponse.model_construct(
                 success=True,
                 workflow_name=workflow_name,
-                sessions_completed=result.get('sessions_completed', 0),
-                templates_recorded=result.get('templates_recorded', len(user_journey_paths)),
+                sessions_completed=result.sessions_completed,
+                templates_recorded=result.templates_recorded if result.templates_recorded is not None else len(user_journey_paths),
                 execution_time_seconds=round(execution_time, 2),
-                performance_note=result.get('performance_note', f'Completed in {execution_time:.1f}s'),
+                performance_note=result.performance_note or f'Completed in {execution_time:.1f}s',
                 test_mode=request.test_mode,
-                failed_actions=result.get('failed_actions') if request.test_mode else None,
-                validation_summary=result.get('validation_summary') if request.test_mode else None
+                failed_actions=result.failed_actions if request.test_mode else None,
+                validation_summary=result.validation_summary if request.test_mode else None
             )
             
-            return response
+            return response.model_dump(mode='json')
             
         else:
-            error_msg = result.get('error', 'Unknown execution error') if result else 'Execution returned no result'
-            return DirectExecutionResponse(
+            error_msg = (result.error or 'Unknown execution error') if result else 'Execution returned no result'
+            return DirectExecutionResponse.model_construct(
                 success=False,
                 workflow_name=workflow_name,
                 sessions_completed=0,
@@ -125,16 +144,16 @@ async def execute_workflow(request: DirectExecutionRequest):
                 execution_time_seconds=round(execution_time, 2),
                 error=error_msg,
                 test_mode=request.test_mode
-            )
+            ).model_dump(mode='json')
             
     except Exception as e:
-        execution_time = time.time() - start_time
-        return DirectExecutionResponse(
+        execution_time = time.monotonic() - start_time
+        return DirectExecutionResponse.model_construct(
             success=False,
-            workflow_name=request.workflow_json.workflow_name if hasattr(request.workflow_json, 'workflow_name') else 'unknown',
+            workflow_name=request.workflow_json.workflow_name,
             sessions_completed=0,
             templates_recorded=0,
             execution_time_seconds=round(execution_time, 2),
             error=str(e),
             test_mode=request.test_mode
-        ) 
\ No newline at end of file
+        ).model_dump(mode='json') 
\ No newline at end of file
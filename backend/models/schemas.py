@@ -1,20 +1,15 @@
-from pydantic import BaseModel, Field, HttpUrl
-from typing import List, Dict, Any, Optional, Union
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl, field_validator
+from typing import List, Dict, Any, Optional, Literal
 from datetime import datetime
-from enum import Enum
 
 # ElementType and TaggedElement removed - ChatGPT analyzes codebase directly
 
-class StepAction(str, Enum):
-    CLICK = "click"
-    TYPE = "type"
-    WAIT = "wait"
-    NAVIGATE = "navigate"
-    SCROLL = "scroll"
-    HOVER = "hover"
-    SELECT = "select"
+# Plain string literals validate faster than an Enum and dump to the same values
+StepAction = Literal["click", "type", "wait", "navigate", "scroll", "hover", "select"]
 
 class SimulationStep(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     action: StepAction = Field(..., description="Action to perform")
     selector: Optional[str] = Field(None, description="CSS selector for action target")
     value: Optional[str] = Field(None, description="Text to type or URL to navigate to")
@@ -22,6 +17,8 @@ class SimulationStep(BaseModel):
     description: Optional[str] = Field(None, description="Human-readable step description")
 
 class UserJourneyPath(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     path_id: str = Field(..., description="Unique identifier for this user journey path")
     percentage: Optional[float] = Field(None, description="Percentage of users who follow this exact path (null if using user segments)", ge=0, le=100)
     description: str = Field(..., description="Human-readable description of user behavior")
@@ -30,12 +27,16 @@ class UserJourneyPath(BaseModel):
 # New models for user segmentation
 class Account(BaseModel):
     """Represents a B2B company/organization account"""
+    model_config = ConfigDict(frozen=True)
+    
     account_id: str = Field(..., description="Unique company identifier (e.g. 'acmecorp')")
     attributes: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Company attributes (e.g. tier, industry)")
     user_count: int = Field(10, description="Number of users in this account", ge=1)
 
 class UserSegment(BaseModel):
     """Defines a user segment with minimal metadata and path preferences"""
+    model_config = ConfigDict(frozen=True)
+    
     segment_id: str = Field(..., description="Unique identifier for this user segment")
     percentage: float = Field(..., description="Percentage of total users in this segment", ge=0, le=100)
     description: str = Field(..., description="Human-readable description of this user segment")
@@ -47,6 +48,8 @@ class UserSegment(BaseModel):
     path_preferences: Dict[str, float] = Field(..., description="Mapping of path_id to percentage preference for this segment")
 
 class WorkflowDefinition(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     workflow_name: str = Field(..., description="Unique identifier for the workflow")
     description: Optional[str] = Field(None, description="Human-readable description")
     user_journey_paths: List[UserJourneyPath] = Field(..., description="Specific user journey paths with percentages")
@@ -103,10 +106,16 @@ class SimulationResponse(BaseModel):
 # Streamlined execution schemas
 class DirectExecutionRequest(BaseModel):
     workflow_json: WorkflowDefinition = Field(..., description="Complete workflow definition")
-    app_url: HttpUrl = Field(..., description="Live app URL to execute against")
+    app_url: str = Field(..., description="Live app URL to execute against")
     user_count: int = Field(100, description="Total number of users to simulate")
     batch_size: int = Field(10, description="Number of users to process in each batch")
     test_mode: bool = Field(False, description="If true, only test recording with minimal delays and return validation results")
+    
+    @field_validator('app_url')
+    @classmethod
+    def validate_app_url(cls, v: str) -> str:
+        """Validate as an HttpUrl once and keep the canonical string form"""
+        return str(HttpUrl(v))
 
 class DirectExecutionResponse(BaseModel):
     success: bool = Field(..., description="Whether execution completed successfully")
@@ -1,77 +1,98 @@
-import json
+import orjson
 import re
-from typing import List, Dict, Any, Callable, Optional
-from datetime import datetime
+import time
+from collections import defaultdict
+from typing import List, Dict, Any, Callable, Iterator, Optional
+from datetime import datetime, timezone
 from playwright.async_api import Page, Route, Request
 import asyncio
 
 # Database imports removed - now stateless
 from ..models.schemas import PendoEvent
 
+# Request headers kept on captured events (the rest are never consulted)
+_CAPTURED_HEADERS = ("content-type", "content-length", "x-pendo-integration-key")
+
 class PendoEventInterceptor:
     def __init__(self):
         pass  # Now stateless
-        self.captured_events: List[Dict[str, Any]] = []
         self.session_id: Optional[int] = None
         
-        # Pendo URL patterns to intercept
+        # Pendo URL patterns to intercept, compiled into the one matcher the page route uses
+        # so only Pendo traffic reaches Python
         self.pendo_patterns = [
             r'.*\.pendo\.io.*',
             r'.*pendo.*analytics.*',
             r'.*pendo.*events.*',
             r'.*pendo.*track.*'
         ]
+        self._pendo_re = re.compile("|".join(f"(?:{p})" for p in self.pendo_patterns), re.IGNORECASE)
+        
+        # Captured events stored column-wise (one list per field) plus a type -> indices index
+        self._reset_columns()
+        
+        # Set whenever a new event is captured so waiters wake without polling
+        self._event_added = asyncio.Event()
+    
+    def _reset_columns(self):
+        """Reset the captured event columns and the per-type index"""
+        self._ev_type: List[str] = []
+        self._ev_url: List[str] = []
+        self._ev_payload: List[Dict[str, Any]] = []
+        self._ev_ts: List[float] = []  # time.monotonic() at capture
+        self._by_type: Dict[str, List[int]] = defaultdict(list)
+        # Converts the monotonic capture times to epoch seconds on export; re-read per session
+        # so wall-clock adjustments (NTP, suspend) don't accumulate over a long-lived process
+        self._monotonic_to_epoch = time.time() - time.monotonic()
+    
+    def _event_at(self, index: int) -> Dict[str, Any]:
+        """Materialize the captured event at the given index as a dict"""
+        # Naive UTC, matching the datetime.utcnow() values events used to carry
+        timestamp = datetime.fromtimestamp(self._ev_ts[index] + self._monotonic_to_epoch, timezone.utc).replace(tzinfo=None)
+        return {
+            'event_type': self._ev_type[index],
+            'url': self._ev_url[index],
+            'payload': {**self._ev_payload[index], 'timestamp': timestamp.isoformat()},
+            'timestamp': timestamp
+        }
     
     def set_session_id(self, session_id: int):
         """Set the session ID for event tracking"""
         self.session_id = session_id
-        self.captured_events = []
+        self._reset_columns()
     
     async def setup_interception(self, page: Page):
         """Set up network interception for Pendo events"""
-        await page.route("**/*", self._handle_request)
+        await page.route(self._pendo_re, self._capture_pendo_event_route)
     
-    async def _handle_request(self, route: Route):
-        """Handle intercepted network requests"""
-        request = route.request
-        
-        # Check if this is a Pendo request
-        if self._is_pendo_request(request.url):
-            # Capture the request data
-            await self._capture_pendo_event(request)
+    async def _capture_pendo_event_route(self, route: Route):
+        """Handle a routed Pendo request (non-Pendo traffic never reaches here)"""
+        await self._capture_pendo_event(route.request)
         
         # Always continue the request to maintain normal app behavior
         await route.continue_()
     
-    def _is_pendo_request(self, url: str) -> bool:
-        """Check if URL matches Pendo patterns"""
-        for pattern in self.pendo_patterns:
-            if re.match(pattern, url, re.IGNORECASE):
-                return True
-        return False
-    
     async def _capture_pendo_event(self, request: Request):
         """Capture and store a Pendo event"""
         try:
-            # Extract event data
-            url = request.url
+            # Only POST requests carry a body - GETs skip the post_data read entirely
             method = request.method
-            headers = dict(request.headers)
-            
-            # Get POST data if available
             post_data = None
             if method == "POST":
                 try:
-                    post_data = request.post_data
-                    if post_data:
-                        # Try to parse as JSON
-                        try:
-                            post_data = json.loads(post_data)
-                        except json.JSONDecodeError:
-                            # Keep as string if not valid JSON
-                            pass
+                    raw_post_data = request.post_data
                 except Exception:
-                    post_data = None
+                    raw_post_data = None
+                if raw_post_data:
+                    # Try to parse as JSON, keeping the string if it is not valid JSON
+                    try:
+                        post_data = orjson.loads(raw_post_data)
+                    except orjson.JSONDecodeError:
+                        post_data = raw_post_data
+            
+            url = request.url
+            request_headers = request.headers
+            headers = {k: request_headers[k] for k in _CAPTURED_HEADERS if k in request_headers}
             
             # Determine event type from URL and data
             event_type = self._determine_event_type(url, post_data)
@@ -81,17 +102,16 @@ class PendoEventInterceptor:
                 'method': method,
                 'url': url,
                 'headers': headers,
-                'post_data': post_data,
-                'timestamp': datetime.utcnow().isoformat()
+                'post_data': post_data
             }
             
             # Store in memory for immediate access (stateless)
-            self.captured_events.append({
-                'event_type': event_type,
-                'url': url,
-                'payload': event_payload,
-                'timestamp': datetime.utcnow()
-            })
+            self._by_type[event_type].append(len(self._ev_type))
+            self._ev_type.append(event_type)
+            self._ev_url.append(url)
+            self._ev_payload.append(event_payload)
+            self._ev_ts.append(time.monotonic())
+            self._event_added.set()
             
             # Database storage removed - now stateless
                 
@@ -107,7 +127,7 @@ class PendoEventInterceptor:
             return 'track'
         elif 'identify' in url_lower:
             return 'identify'
-        elif 'page' in url_lower or 'pageview' in url_lower:
+        elif 'page' in url_lower:
             return 'page'
         elif 'guide' in url_lower:
             return 'guide'
@@ -128,31 +148,45 @@ class PendoEventInterceptor:
         return 'unknown'
     
     def get_captured_events(self) -> List[Dict[str, Any]]:
-        """Get all events captured in the current session"""
-        return self.captured_events.copy()
+        """Get all events captured in the current session (prefer iter_captured_events)"""
+        return list(self.iter_captured_events())
+    
+    def iter_captured_events(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over captured events, materializing each one only as it is reached"""
+        for i in range(len(self._ev_type)):
+            yield self._event_at(i)
     
     def get_event_count(self) -> int:
         """Get the number of events captured"""
-        return len(self.captured_events)
+        return len(self._ev_type)
     
     def clear_events(self):
         """Clear captured events"""
-        self.captured_events = []
+        self._reset_columns()
     
     async def wait_for_events(self, expected_count: int, timeout_seconds: int = 20) -> bool:
         """Wait for a specific number of events to be captured"""
-        start_time = datetime.utcnow()
+        deadline = time.monotonic() + timeout_seconds
         
-        while len(self.captured_events) < expected_count:
-            if (datetime.utcnow() - start_time).total_seconds() > timeout_seconds:
+        while len(self._ev_type) < expected_count:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._event_added.clear()
+            try:
+                await asyncio.wait_for(self._event_added.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
                 return False
-            await asyncio.sleep(0.1)
         
         return True
     
     def filter_events_by_type(self, event_type: str) -> List[Dict[str, Any]]:
         """Filter captured events by type"""
-        return [event for event in self.captured_events if event['event_type'] == event_type]
+        return [self._event_at(i) for i in self._by_type.get(event_type, ())]
 
-# Global interceptor instance
-pendo_interceptor = PendoEventInterceptor() 
\ No newline at end of file
+async def attach_pendo_interceptor(page: Page) -> PendoEventInterceptor:
+    """Create an interceptor for a single page, keep it on the page and start intercepting its Pendo requests"""
+    interceptor = PendoEventInterceptor()
+    page._pendo_interceptor = interceptor
+    await interceptor.setup_interception(page)
+    return interceptor
@@ -7,21 +7,61 @@ then replays them at scale with realistic variations.
 """
 
 import base64
-import json
+import sys
+import orjson
 import gzip
 import urllib.parse
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from functools import partial
+from typing import Dict, List, Any, Callable, Optional
 import random
 import string
 import asyncio
+import os
+import time
+import logging
+from itertools import chain
 import aiohttp
 import ssl
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field, fields
 import re
+import numpy as np
 from faker import Faker
 
-@dataclass
+try:
+    # ISA-L accelerated deflate - drop-in replacement for the zlib module
+    from isal import isal_zlib as zlib
+except ImportError:
+    import zlib
+
+# Per-request/per-event output goes through this logger (DEBUG) so bulk replay doesn't pay for print()
+logger = logging.getLogger(__name__)
+
+# One TLS context for every replay connection; certificate
+# verification stays off to match the demo-mode session
+_REPLAY_SSL_CONTEXT = ssl.create_default_context()
+_REPLAY_SSL_CONTEXT.check_hostname = False
+_REPLAY_SSL_CONTEXT.verify_mode = ssl.CERT_NONE
+_REPLAY_SSL_CONTEXT.set_alpn_protocols(['http/1.1'])
+
+# Sentinels written into prototype events in place of per-session values (see PendoReplay._build_prototype)
+_PROTO_BROWSER_TIME = '__pendo_browser_time__'
+_PROTO_VISITOR_ID = '__pendo_visitor_id__'
+_PROTO_ACCOUNT_ID = '__pendo_account_id__'
+_PROTO_SESSION_ID = '__pendo_session_id__'
+_PROTO_TAB_ID = '__pendo_tab_id__'
+_PROTO_FRAME_ID = '__pendo_frame_id__'
+_PROTO_META_PROPS = '__pendo_meta_props_{}__'
+_PROTO_SENTINEL_RE = re.compile(rb'"(__pendo_[a-z0-9_]+__)"')
+
+# Retry policy for replayed Pendo requests (429/5xx/network errors)
+_MAX_SEND_ATTEMPTS = 5
+_MAX_RETRY_DELAY_SECONDS = 60.0
+
+# Alphabet for generated session/tab/frame IDs
+_ID_CHARS = string.ascii_letters + string.digits
+
+@dataclass(slots=True)
 class PendoEventTemplate:
     """Template for a Pendo event with variable placeholders"""
     path_id: str
@@ -30,15 +70,65 @@ class PendoEventTemplate:
     query_params: Dict[str, str]
     decoded_events: List[Dict[str, Any]]
     timing_delay_ms: int  # Delay from previous event
+    # Derived: url-encoded query params minus the per-request 'jzb' and 'ct', with a trailing '&' if non-empty
+    static_query: str = field(init=False, repr=False, compare=False)
+    # Derived at replay time: serialized events split around their sentinels, meta event props and request headers
+    proto_statics: Optional[List[bytes]] = field(init=False, repr=False, compare=False)
+    proto_keys: Optional[List[str]] = field(init=False, repr=False, compare=False)
+    meta_props: Optional[List[Dict[str, Any]]] = field(init=False, repr=False, compare=False)
+    request_headers: Optional[Dict[str, str]] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        static_query = urllib.parse.urlencode(
+            {k: v for k, v in self.query_params.items() if k not in ('jzb', 'ct')}
+        )
+        self.static_query = f"{static_query}&" if static_query else ""
+        self.proto_statics = None
+        self.proto_keys = None
+        self.meta_props = None
+        self.request_headers = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable form of the template (derived fields excluded)"""
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.init}
+
+def _jzb_decompressors(data: bytes) -> List[Callable[[bytes], bytes]]:
+    """Candidate jzb decompressors, the one matching the magic bytes first"""
+    # Magic bytes: 0x1f8b gzip, 0x78 zlib, otherwise raw deflate
+    if data[:2] == b'\x1f\x8b':
+        detected = gzip.decompress
+    elif data[:1] == b'\x78':
+        detected = partial(zlib.decompress, wbits=15)
+    else:
+        detected = partial(zlib.decompress, wbits=-15)
+    
+    return [
+        detected,
+        # Method 1: zlib with different wbits values (deflate/zlib formats)
+        *(partial(zlib.decompress, wbits=wbits) for wbits in (-15, 15, -13, 13)),
+        # Method 2: skip the 0x78 0x9c zlib header and try raw deflate
+        lambda payload: zlib.decompress(payload[2:], -15),
+        # Method 3: gzip
+        gzip.decompress,
+        # Method 4: uncompressed data
+        bytes
+    ]
 
 class PendoCapture:
     """Captures Pendo requests during browser simulation"""
     
     def __init__(self):
         self.captured_requests: Dict[str, List[PendoEventTemplate]] = {}
+        # Decompressor that decoded the last jzb payload (Pendo sticks to one format)
+        self._fast_path = None
+        # Decoded events by jzb payload; paths that repeat a step send byte-identical beacons
+        self._decoded_jzb: Dict[str, List[Dict[str, Any]]] = {}
+        # Intercepted (url, method, path_id, sequence, delay) awaiting parsing off the route path
+        self._capture_queue: asyncio.Queue = asyncio.Queue()
+        self._consumer_task: Optional[asyncio.Task] = None
     
     async def intercept_pendo_request(self, route, path_id: str, sequence_order: int, original_delay_ms: int = 1000) -> bool:
-        """Intercept and capture Pendo requests during browser simulation"""
+        """Intercept Pendo requests during browser simulation and queue them for capture"""
         request = route.request
         
         # Check for any Pendo-related requests (broader filter)
@@ -47,53 +137,81 @@ class PendoCapture:
             'pendo' in request.url.lower()
         )
         
-        if is_pendo_request:
-            import datetime
-            current_time = datetime.datetime.now().strftime("%H:%M:%S.%f")[:-3]
-            print(f"📡 [{current_time}] Intercepting Pendo GET request: {request.url[:100]}...")
-            
-            # Parse the request
-            parsed_url = urllib.parse.urlparse(request.url)
-            query_params = urllib.parse.parse_qs(parsed_url.query)
-            
-            print(f"   → Method: {request.method}")
-            print(f"   → Base URL: {parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}")
-            
-            # Decode the jzb parameter
-            if 'jzb' in query_params:
-                jzb_encoded = query_params['jzb'][0]
-                decoded_events = self.decode_jzb(jzb_encoded)
-                if decoded_events:
-                    pass  # Events decoded successfully
-                
-                # Create template
-                template = PendoEventTemplate(
-                    path_id=path_id,
-                    sequence_order=sequence_order,
-                    base_url=f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}",
-                    query_params={k: v[0] for k, v in query_params.items()},
-                    decoded_events=decoded_events,
-                    timing_delay_ms=original_delay_ms  # Use original workflow delay
-                )
-                
-                # Store the template
-                if path_id not in self.captured_requests:
-                    self.captured_requests[path_id] = []
-                self.captured_requests[path_id].append(template)
-                
-                print(f"✅ Captured Pendo GET request for {path_id} (sequence {sequence_order})")
-                
-                # Continue the request
-                await route.continue_()
-                return True  # Successfully captured a Pendo request
-            else:
-                print(f"   ⚠️ No jzb parameter found in query params: {list(query_params.keys())}")
-                await route.continue_()
-                return True  # Still a Pendo request, just no jzb
-        
-        # Not a Pendo request - continue without capturing
+        # Release the request immediately; parsing and decoding happen in the background
         await route.continue_()
-        return False  # Did not capture
+        
+        if not is_pendo_request:
+            return False  # Did not capture
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            current_time = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+            logger.debug("📡 [%s] Intercepting Pendo GET request: %s...", current_time, request.url[:100])
+        
+        self._capture_queue.put_nowait((request.url, request.method, path_id, sequence_order, original_delay_ms))
+        if self._consumer_task is None:
+            self._consumer_task = asyncio.create_task(self._consume_captures())
+        return True  # Pendo request queued for capture
+    
+    async def _consume_captures(self):
+        """Background consumer that turns queued Pendo requests into templates"""
+        while True:
+            url, method, path_id, sequence_order, original_delay_ms = await self._capture_queue.get()
+            try:
+                self._capture_request(url, method, path_id, sequence_order, original_delay_ms)
+            except Exception as e:
+                logger.warning("⚠️ Failed to capture Pendo request for %s: %s", path_id, e)
+            finally:
+                self._capture_queue.task_done()
+    
+    async def wait_captured(self):
+        """Wait until the Pendo requests intercepted so far have been captured (consumer keeps running)"""
+        await self._capture_queue.join()
+    
+    async def flush(self):
+        """Wait until every intercepted Pendo request has been captured"""
+        if self._consumer_task is None:
+            return
+        await self._capture_queue.join()
+        self._consumer_task.cancel()
+        self._consumer_task = None
+    
+    def _capture_request(self, url: str, method: str, path_id: str, sequence_order: int, original_delay_ms: int):
+        """Parse one intercepted Pendo request into a template"""
+        # Parse the request
+        parsed_url = urllib.parse.urlparse(url)
+        query_params = urllib.parse.parse_qs(parsed_url.query)
+        
+        logger.debug("   → Method: %s", method)
+        logger.debug("   → Base URL: %s://%s%s", parsed_url.scheme, parsed_url.netloc, parsed_url.path)
+        
+        # Decode the jzb parameter
+        if 'jzb' not in query_params:
+            logger.debug("   ⚠️ No jzb parameter found in query params: %s", list(query_params.keys()))
+            return  # Still a Pendo request, just no jzb
+        
+        # Decode each distinct jzb payload once (captures are parsed one at a time by the consumer,
+        # so there is never a decode of the same payload in flight)
+        jzb_encoded = query_params['jzb'][0]
+        decoded_events = self._decoded_jzb.get(jzb_encoded)
+        if decoded_events is None:
+            decoded_events = self._decoded_jzb[jzb_encoded] = self.decode_jzb(jzb_encoded)
+        
+        # Create template
+        template = PendoEventTemplate(
+            path_id=path_id,
+            sequence_order=sequence_order,
+            base_url=f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}",
+            query_params={k: v[0] for k, v in query_params.items()},
+            decoded_events=decoded_events,
+            timing_delay_ms=original_delay_ms  # Use original workflow delay
+        )
+        
+        # Store the template
+        if path_id not in self.captured_requests:
+            self.captured_requests[path_id] = []
+        self.captured_requests[path_id].append(template)
+        
+        logger.info("✅ Captured Pendo GET request for %s (sequence %s)", path_id, sequence_order)
     
     def decode_jzb(self, jzb_encoded: str) -> List[Dict[str, Any]]:
         """Decode Pendo's jzb parameter"""
@@ -124,91 +242,116 @@ class PendoCapture:
                 except Exception as std_b64_error:
                     return []
             
-            # Try decompression with multiple approaches
-            json_string = None
-            
-            # Method 1: Try zlib with different wbits values
-            import zlib
-            for wbits in [-15, 15, -13, 13]:  # Different deflate/zlib formats
+            # Fast path: reuse whichever decompressor worked for the previous payload
+            if self._fast_path is not None:
                 try:
-                    zlib_decoded = zlib.decompress(base64_decoded, wbits)
-                    json_string = zlib_decoded.decode('utf-8')
-                    break
-                except Exception as e:
-                    continue
-            
-            # Method 2: Try raw deflate if zlib failed
-            if not json_string:
-                try:
-                    # Skip zlib header and try raw deflate 
-                    raw_data = base64_decoded[2:]  # Skip 0x78, 0x9c header
-                    deflate_decoded = zlib.decompress(raw_data, -15)  # Raw deflate
-                    json_string = deflate_decoded.decode('utf-8')
-                except Exception as deflate_error:
-                    pass
-            
-            # Method 3: Try gzip as fallback
-            if not json_string:
-                try:
-                    gzip_decoded = gzip.decompress(base64_decoded)
-                    json_string = gzip_decoded.decode('utf-8')
-                except Exception as gzip_error:
-                    pass
+                    events = orjson.loads(self._fast_path(base64_decoded))
+                    return events if isinstance(events, list) else [events]
+                except Exception:
+                    pass  # Format changed - fall back to detection below
             
-            # Method 4: Try as uncompressed data
-            if not json_string:
+            # Try each decompression approach in turn, the magic-byte match first
+            json_bytes = None
+            for decompress in _jzb_decompressors(base64_decoded):
                 try:
-                    json_string = base64_decoded.decode('utf-8')
-                except Exception as utf8_error:
-                    return []
+                    json_bytes = decompress(base64_decoded)
+                except Exception:
+                    continue
+                if json_bytes:
+                    break
             
-            # Final check if we got valid JSON string
-            if not json_string:
+            # Final check if we got a JSON payload
+            if not json_bytes:
                 return []
             
-            # Parse JSON
-            events = json.loads(json_string)
+            # Parse JSON straight from bytes (orjson validates the UTF-8)
+            events = orjson.loads(json_bytes)
             parsed_events = events if isinstance(events, list) else [events]
+            self._fast_path = decompress
             
             return parsed_events
             
         except Exception as e:
             return []
     
-    def save_templates(self, workflow_name: str):
-        """Save captured templates to database or file"""
-        # For now, save to JSON file
-        templates_data = {}
+    async def save_templates(self, workflow_name: str):
+        """Save captured templates to database or file (off the event loop)"""
+        await self.flush()
+        await asyncio.to_thread(self._save_templates_sync, workflow_name)
+    
+    def _save_templates_sync(self, workflow_name: str):
+        """Blocking implementation of save_templates"""
+        # For now, save to JSON file. The document is streamed one path at a time so only a
+        # single path's templates are serialized in memory, and written to a temporary file
+        # that replaces the previous templates only once it is complete
+        filename = f"pendo_templates_{workflow_name}.json"
+        partial_filename = f"{filename}.partial"
         total_requests = 0
         
-        for path_id, templates in self.captured_requests.items():
-            templates_data[path_id] = [asdict(t) for t in templates]
-            total_requests += len(templates)
-            
-            print(f"📋 Path '{path_id}': captured {len(templates)} GET requests")
-            for i, template in enumerate(templates[:2]):  # Show first 2
-                events_count = len(template.decoded_events)
-                base_url = template.base_url
-                print(f"   Request {i+1}: {base_url} ({events_count} events)")
-        
-        filename = f"pendo_templates_{workflow_name}.json"
-        with open(filename, 'w') as f:
-            json.dump(templates_data, f, indent=2)
+        with open(partial_filename, 'wb') as f:
+            f.write(b'{')
+            for index, (path_id, templates) in enumerate(self.captured_requests.items()):
+                total_requests += len(templates)
+                
+                logger.info("📋 Path '%s': captured %s GET requests", path_id, len(templates))
+                for i, template in enumerate(templates[:2]):  # Show first 2
+                    events_count = len(template.decoded_events)
+                    base_url = template.base_url
+                    logger.info("   Request %s: %s (%s events)", i+1, base_url, events_count)
+                
+                f.write(b',\n' if index else b'\n')
+                f.write(orjson.dumps(path_id))
+                f.write(b': ')
+                f.write(orjson.dumps([t.to_dict() for t in templates], option=orjson.OPT_INDENT_2))
+            f.write(b'\n}')
+        os.replace(partial_filename, filename)
         
-        print(f"💾 Saved {len(self.captured_requests)} paths ({total_requests} total GET requests) to {filename}")
+        logger.info("💾 Saved %s paths (%s total GET requests) to %s", len(self.captured_requests), total_requests, filename)
         
         if total_requests == 0:
-            print("⚠️ No Pendo GET requests were captured!")
-            print("   Make sure:")
-            print("   - Your app has Pendo script loaded")
-            print("   - Elements have data-pendo-id attributes")
-            print("   - Pendo is firing events to data.pendo.io")
+            logger.warning("⚠️ No Pendo GET requests were captured!")
+            logger.warning("   Make sure:")
+            logger.warning("   - Your app has Pendo script loaded")
+            logger.warning("   - Elements have data-pendo-id attributes")
+            logger.warning("   - Pendo is firing events to data.pendo.io")
+
+def create_replay_session() -> aiohttp.ClientSession:
+    """Create the HTTP session used for Pendo replay (must be called inside a running loop)"""
+    # Create session with SSL verification disabled for demo purposes
+    try:
+        # First try with SSL verification disabled; pool sized for bulk replay against a single Pendo host
+        connector = aiohttp.TCPConnector(
+            ssl=_REPLAY_SSL_CONTEXT,
+            limit=0,
+            limit_per_host=64,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True,
+            keepalive_timeout=75
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=30)
+        )
+        logger.info("🔒 Created HTTP session with SSL verification disabled (demo mode)")
+    except Exception as e:
+        logger.warning("⚠️ SSL config failed, using default: %s", e)
+        session = aiohttp.ClientSession()
+    return session
 
 class PendoReplay:
     """Replays captured Pendo requests at scale with variations"""
     
-    def __init__(self):
-        self.session = None
+    def __init__(self, max_concurrent_requests: int = 512, micro_batch_size: int = 8, session: Optional[aiohttp.ClientSession] = None):
+        self.session = session
+        # Only sessions created in __aenter__ are closed on exit
+        self._owns_session = False
+        self.max_concurrent_requests = max_concurrent_requests
+        # Sessions each replay worker pulls from the queue and runs together
+        self.micro_batch_size = micro_batch_size
+        # Caps in-flight Pendo requests across all journeys (replaces fixed per-request sleeps)
+        self._request_semaphore = asyncio.Semaphore(max_concurrent_requests)
+        # Loop time until which sends are paused after a 429 from Pendo
+        self._rate_limited_until = 0.0
         # Realistic browser headers for server-side attribution
         self.user_agent = (
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -217,29 +360,31 @@ class PendoReplay:
         )
         # Faker for realistic visitor identities
         self.faker = Faker()
+        # Replay prototypes by (static query, events), kept across prepare_templates calls so
+        # paths prepared one at a time (streamed replay) still share them
+        self._prototypes = {}
     
     async def __aenter__(self):
-        # Create session with SSL verification disabled for demo purposes
-        try:
-            # First try with SSL disabled
-            connector = aiohttp.TCPConnector(ssl=False)
-            self.session = aiohttp.ClientSession(connector=connector)
-            print("🔒 Created HTTP session with SSL verification disabled (demo mode)")
-        except Exception as e:
-            print(f"⚠️ SSL config failed, using default: {e}")
-            self.session = aiohttp.ClientSession()
+        # Reuse a session handed in by the caller (e.g. the Simulator's warm pool)
+        if self.session is None:
+            self.session = create_replay_session()
+            self._owns_session = True
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
     
-    def load_templates(self, workflow_name: str) -> Dict[str, List[PendoEventTemplate]]:
-        """Load captured templates from file"""
+    async def load_templates(self, workflow_name: str) -> Dict[str, List[PendoEventTemplate]]:
+        """Load captured templates from file (off the event loop)"""
+        return await asyncio.to_thread(self._load_templates_sync, workflow_name)
+    
+    def _load_templates_sync(self, workflow_name: str) -> Dict[str, List[PendoEventTemplate]]:
+        """Blocking implementation of load_templates"""
         filename = f"pendo_templates_{workflow_name}.json"
         try:
-            with open(filename, 'r') as f:
-                data = json.load(f)
+            with open(filename, 'rb') as f:
+                data = orjson.loads(f.read())
             
             templates = {}
             total_events = 0
@@ -247,23 +392,57 @@ class PendoReplay:
             for path_id, template_list in data.items():
                 templates[path_id] = []
                 for template_data in template_list:
+                    # Intern strings that repeat across every template of a workflow
+                    template_data['path_id'] = sys.intern(template_data['path_id'])
+                    template_data['base_url'] = sys.intern(template_data['base_url'])
+                    template_data['query_params'] = {
+                        sys.intern(k): sys.intern(v) if isinstance(v, str) else v
+                        for k, v in template_data['query_params'].items()
+                    }
                     template = PendoEventTemplate(**template_data)
                     templates[path_id].append(template)
                     event_count = len(template.decoded_events)
                     total_events += event_count
-                    print(f"📋 Loaded template {path_id} seq {template.sequence_order}: {event_count} events")
+                    logger.info("📋 Loaded template %s seq %s: %s events", path_id, template.sequence_order, event_count)
             
-            print(f"✅ Loaded {len(templates)} paths with {total_events} total events")
-            return templates
+            logger.info("✅ Loaded %s paths with %s total events", len(templates), total_events)
+            return self.prepare_templates(templates)
         except FileNotFoundError:
-            print(f"❌ Template file {filename} not found")
+            logger.warning("❌ Template file %s not found", filename)
             return {}
         except Exception as e:
-            print(f"❌ Failed to load templates: {e}")
+            logger.warning("❌ Failed to load templates: %s", e)
             import traceback
             traceback.print_exc()
             return {}
     
+    def prepare_templates(self, templates: Dict[str, List[PendoEventTemplate]]) -> Dict[str, List[PendoEventTemplate]]:
+        """Build replay prototypes and return each path's templates in sequence order"""
+        # Paths that share steps (login, navigation, ...) capture identical requests;
+        # those templates share one prototype instead of each building their own
+        prototypes = self._prototypes
+        
+        for path_templates in templates.values():
+            for template in path_templates:
+                if template.proto_keys is not None:
+                    continue
+                prototype_key = (template.static_query, orjson.dumps(template.decoded_events))
+                shared = prototypes.get(prototype_key)
+                if shared is None:
+                    self._build_prototype(template)
+                    prototypes[prototype_key] = template
+                else:
+                    template.proto_statics = shared.proto_statics
+                    template.proto_keys = shared.proto_keys
+                    template.meta_props = shared.meta_props
+                    template.request_headers = shared.request_headers
+        
+        # Journeys replay in sequence order; sort each path once here rather than per user
+        return {
+            path_id: sorted(path_templates, key=lambda t: t.sequence_order)
+            for path_id, path_templates in templates.items()
+        }
+    
     def generate_user_session_ids(self, segment_metadata: Dict[str, Any] = None) -> Dict[str, str]:
         """Generate realistic session identifiers for one user, optionally based on segment metadata"""
         
@@ -350,8 +529,7 @@ class PendoReplay:
     
     def random_string(self, length: int) -> str:
         """Generate random string for IDs"""
-        chars = string.ascii_letters + string.digits
-        return ''.join(random.choice(chars) for _ in range(length))
+        return ''.join(random.choices(_ID_CHARS, k=length))
     
     async def replay_user_journey(
         self, 
@@ -362,136 +540,188 @@ class PendoReplay:
         """Replay a complete user journey with realistic timing"""
         
         current_timestamp = user_base_timestamp
+        requests = []
+        
+        # The user's identifiers are the same in every request, so encode them once per journey
+        session_values = self._encode_session_values(session_ids)
+        # Likewise the visitor/account objects spliced into meta events
+        meta_identity = self._meta_identity(session_ids) if any(t.meta_props for t in templates) else None
         
-        for template in sorted(templates, key=lambda t: t.sequence_order):
+        # Prepared paths are already in sequence order (see prepare_templates)
+        for template in templates:
             # Add realistic delay from previous event
             current_timestamp += timedelta(milliseconds=template.timing_delay_ms or random.randint(1000, 4000))
             
             # Generate the request
-            await self.send_pendo_request(template, current_timestamp, session_ids)
-            
-            # Small delay to avoid overwhelming the server
-            await asyncio.sleep(0.01)  # 10ms between requests
+            requests.append(self.send_pendo_request(template, current_timestamp, session_ids, session_values, meta_identity))
+        
+        # Timestamps are fixed up front, so the journey's requests can all be in flight together
+        await asyncio.gather(*requests)
     
     async def send_pendo_request(
         self, 
         template: PendoEventTemplate, 
         timestamp: datetime,
-        session_ids: Dict[str, str]
+        session_ids: Dict[str, str],
+        session_values: Optional[Dict[str, bytes]] = None,
+        meta_identity: Optional[tuple] = None
     ):
         """Send a single Pendo request with variations"""
         
-        # Create modified events
-        modified_events = []
         browser_time = int(timestamp.timestamp() * 1000)
         
-        for event in template.decoded_events:
-            modified_event = event.copy()
+        if template.proto_keys is None:
+            self._build_prototype(template)
+        
+        # Interleave the session's JSON values between the prototype's static chunks
+        values = dict(session_values or self._encode_session_values(session_ids))
+        values[_PROTO_BROWSER_TIME] = str(browser_time).encode()
+        for index, base_props in enumerate(template.meta_props):
+            values[_PROTO_META_PROPS.format(index)] = orjson.dumps(self._build_meta_props(base_props, session_ids, meta_identity))
+        
+        statics = template.proto_statics
+        json_bytes = b''.join(chain.from_iterable(zip(statics, [values[k] for k in template.proto_keys]))) + statics[-1]
+        
+        # Encode back to jzb format
+        jzb_encoded = self._compress_to_jzb(json_bytes)
+        
+        # Build request URL - preserve original GET format; only ct (client timestamp) and jzb vary.
+        # jzb_encoded is already URL-safe, so it is appended without another urlencode pass
+        url = f"{template.base_url}?{template.static_query}ct={browser_time}&jzb={jzb_encoded}"
+        
+        headers = template.request_headers
+        
+        # Send the GET request (matching original Pendo format); 429/5xx and network errors are retried with backoff
+        loop = asyncio.get_running_loop()
+        for attempt in range(1, _MAX_SEND_ATTEMPTS + 1):
+            # Honour any server-requested pause shared by all in-flight requests
+            pause = self._rate_limited_until - loop.time()
+            if pause > 0:
+                await asyncio.sleep(pause)
             
+            retry_delay = min(2 ** attempt + random.random(), _MAX_RETRY_DELAY_SECONDS)
+            try:
+                async with self._request_semaphore:
+                    async with self.session.get(url, headers=headers) as response:
+                        if response.status == 200:
+                            # Drain the (tiny) body so the keep-alive connection goes back to the pool
+                            # instead of being closed with unread payload
+                            await response.read()
+                            logger.debug("✅ Pendo GET request successful: %s at %s", template.path_id, timestamp)
+                            return
+                        
+                        if response.status != 429 and response.status < 500:
+                            response_text = await response.text()
+                            logger.warning("⚠️ Pendo GET request failed: HTTP %s - %s", response.status, response_text[:200])
+                            return
+                        
+                        if response.status == 429:
+                            retry_delay = self._rate_limit_delay(response.headers, retry_delay)
+                            self._rate_limited_until = max(self._rate_limited_until, loop.time() + retry_delay)
+                        error = f"HTTP {response.status}"
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            
+            if attempt < _MAX_SEND_ATTEMPTS:
+                logger.debug("🔁 Retrying Pendo GET request in %.1fs (attempt %s): %s", retry_delay, attempt, error)
+                await asyncio.sleep(retry_delay)
+        
+        logger.warning("❌ Failed to send Pendo GET request after %s attempts: %s (URL was: %s...)", _MAX_SEND_ATTEMPTS, error, url[:150])
+    
+    def _rate_limit_delay(self, response_headers, default_delay: float) -> float:
+        """Seconds to wait after a 429, from Retry-After or X-RateLimit-Reset when present"""
+        retry_after = response_headers.get('Retry-After')
+        if retry_after:
+            try:
+                return min(float(retry_after), _MAX_RETRY_DELAY_SECONDS)
+            except ValueError:
+                pass  # HTTP-date form - fall back to the default backoff
+        
+        reset = response_headers.get('X-RateLimit-Reset')
+        if reset:
+            try:
+                reset_value = float(reset)
+                # Either an epoch timestamp or a number of seconds until the reset
+                delay = reset_value - time.time() if reset_value > 1e9 else reset_value
+                return min(max(delay, 0.0), _MAX_RETRY_DELAY_SECONDS)
+            except ValueError:
+                pass
+        
+        return default_delay
+    
+    def _encode_session_values(self, session_ids: Dict[str, str]) -> Dict[str, bytes]:
+        """JSON-encode a user's identifiers for the prototype's sentinel slots"""
+        return {
+            _PROTO_VISITOR_ID: orjson.dumps(session_ids['visitor_id']),
+            _PROTO_ACCOUNT_ID: orjson.dumps(session_ids['account_id']),
+            _PROTO_SESSION_ID: orjson.dumps(session_ids['session_id']),
+            _PROTO_TAB_ID: orjson.dumps(session_ids['tab_id']),
+            _PROTO_FRAME_ID: orjson.dumps(session_ids['frame_id'])
+        }
+    
+    def _build_prototype(self, template: PendoEventTemplate):
+        """Pre-serialize a template's events with sentinels in place of the per-session fields"""
+        proto_events = []
+        meta_props = []
+        
+        for event in template.decoded_events:
             # Update with new session data (respect Pendo's expected key casing)
-            modified_event['browser_time'] = browser_time
-            # snake_case fields (as observed in captured events)
-            modified_event['visitor_id'] = session_ids['visitor_id']
-            modified_event['account_id'] = session_ids['account_id']
-            # camelCase fields (override if present; do NOT add snake_case duplicates)
-            modified_event['sessionId'] = session_ids['session_id']
-            modified_event['tabId'] = session_ids['tab_id']
-            modified_event['frameId'] = session_ids['frame_id']
+            proto_event = {
+                **event,
+                'browser_time': _PROTO_BROWSER_TIME,
+                # snake_case fields (as observed in captured events)
+                'visitor_id': _PROTO_VISITOR_ID,
+                'account_id': _PROTO_ACCOUNT_ID,
+                # camelCase fields (override if present; do NOT add snake_case duplicates)
+                'sessionId': _PROTO_SESSION_ID,
+                'tabId': _PROTO_TAB_ID,
+                'frameId': _PROTO_FRAME_ID,
+                # Enrich browser metadata
+                'userAgent': self.user_agent
+            }
 
             # Normalize other possible timestamp fields if present/expected
             # Keep them aligned to browser_time for consistency
             # Some payloads may use camelCase keys depending on event type
-            if 'browserSentTime' in modified_event or 'displayBrowserTime' in modified_event:
-                modified_event['browserSentTime'] = browser_time
-                modified_event['displayBrowserTime'] = browser_time
-            if 'browser_sent_time' in modified_event or 'display_browser_time' in modified_event:
-                modified_event['browser_sent_time'] = browser_time
-                modified_event['display_browser_time'] = browser_time
+            if 'browserSentTime' in proto_event or 'displayBrowserTime' in proto_event:
+                proto_event['browserSentTime'] = _PROTO_BROWSER_TIME
+                proto_event['displayBrowserTime'] = _PROTO_BROWSER_TIME
+            if 'browser_sent_time' in proto_event or 'display_browser_time' in proto_event:
+                proto_event['browser_sent_time'] = _PROTO_BROWSER_TIME
+                proto_event['display_browser_time'] = _PROTO_BROWSER_TIME
 
-            # Enrich browser metadata and classification
-            modified_event['userAgent'] = self.user_agent
             # Prefer version from event; otherwise derive from query param 'v' (strip _prod suffix if present)
-            if 'version' not in modified_event:
+            if 'version' not in proto_event:
                 v = template.query_params.get('v') if isinstance(template.query_params, dict) else None
                 if v:
-                    modified_event['version'] = v.replace('_prod', '')
+                    proto_event['version'] = v.replace('_prod', '')
             # Align with typical values from captured events
-            modified_event.setdefault('source', 'web')
-            modified_event.setdefault('class', 'ui')
+            proto_event.setdefault('source', 'web')
+            proto_event.setdefault('class', 'ui')
 
             # Remove server-assigned/display-only fields if present
             for k in ['id', 'appId', 'note', 'receivedTime', 'processedTime', 'remoteIp',
                       'location', 'displayId', 'displayBrowserTime', 'displayVisitor',
                       'displayAccount', 'displayOtherAgent']:
-                if k in modified_event:
-                    modified_event.pop(k, None)
+                if k in proto_event:
+                    proto_event.pop(k, None)
 
             # Remove unintended snake_case duplicates for IDs if any
             for k in ['session_id', 'tab_id', 'frame_id']:
-                if k in modified_event:
-                    modified_event.pop(k, None)
-            
+                if k in proto_event:
+                    proto_event.pop(k, None)
             
-            # Enrich metadata for meta events with detailed visitor and account information
-            if event.get('type') == 'meta' and 'props' in modified_event:
-                # Get stored metadata from session_ids
-                user_attrs = session_ids.get('_user_attributes', {})
-                account_attrs = session_ids.get('_account_attributes', {})
-                segment_id = session_ids.get('_segment_id', 'default')
-                
-                # Build rich visitor object with dynamic attributes
-                visitor_data = {
-                    'id': session_ids['visitor_id'],
-                    'email': session_ids['visitor_id'],  # visitor_id is the email
-                    'full_name': f"{user_attrs.get('first_name', 'User')} {user_attrs.get('last_name', 'Name')}",
-                    'language': 'en_US'
-                }
-                
-                # Dynamically add ALL user attributes from the JSON (except first_name/last_name which are handled above)
-                for key, value in user_attrs.items():
-                    if key not in ['first_name', 'last_name']:
-                        visitor_data[key] = value
-                
-                # Build rich account object with dynamic attributes
-                account_data = {
-                    'id': session_ids['account_id'],
-                    'name': account_attrs.get('name', session_ids['account_id'].title())
-                }
-                
-                # Dynamically add ALL account attributes from the JSON
-                for key, value in account_attrs.items():
-                    if key != 'name':  # name is handled above
-                        account_data[key] = value
-                
-                # Update the props with rich metadata
-                modified_event['props']['visitor'] = visitor_data
-                modified_event['props']['account'] = account_data
-                
-                # Add segment information if available
-                if segment_id != 'default':
-                    modified_event['props']['segment_id'] = segment_id
+            # Meta event props get per-session visitor/account data, so they are filled in at send time
+            if event.get('type') == 'meta' and 'props' in proto_event:
+                proto_event['props'] = _PROTO_META_PROPS.format(len(meta_props))
+                meta_props.append(event['props'])
             
-            modified_events.append(modified_event)
-        
-        # Encode back to jzb format
-        jzb_encoded = self.encode_to_jzb(modified_events)
-        
-        # Build request URL - preserve original GET format
-        query_params = template.query_params.copy()
-        query_params['jzb'] = jzb_encoded
-        query_params['ct'] = str(browser_time)  # Update client timestamp
-        
-        url = f"{template.base_url}?{urllib.parse.urlencode(query_params)}"
-        
-        print(f"🚀 Replaying Pendo GET request:")
-        print(f"   → URL: {url[:100]}...")
-        print(f"   → Events in payload: {len(modified_events)}")
-        print(f"   → User: {session_ids['visitor_id'][:20]}...")
+            proto_events.append(proto_event)
         
         # Derive referer/origin from the first event URL if available
         referer_url = None
-        if modified_events and isinstance(modified_events[0], dict):
-            referer_url = modified_events[0].get('url')
+        if template.decoded_events and isinstance(template.decoded_events[0], dict):
+            referer_url = template.decoded_events[0].get('url')
         headers = {
             'User-Agent': self.user_agent,
             'Accept': '*/*',
@@ -507,113 +737,199 @@ class PendoReplay:
             except Exception:
                 pass
         
-        # Send the GET request (matching original Pendo format)
-        try:
-            async with self.session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    print(f"✅ Pendo GET request successful: {template.path_id} at {timestamp.strftime('%H:%M:%S')}")
-                else:
-                    print(f"⚠️ Pendo GET request failed: HTTP {response.status}")
-                    response_text = await response.text()
-                    print(f"   Response: {response_text[:200]}")
-        except Exception as e:
-            print(f"❌ Failed to send Pendo GET request: {e}")
-            print(f"   URL was: {url[:150]}...")
+        # Split once around the quoted sentinels: [static, key, static, key, ..., static]
+        parts = _PROTO_SENTINEL_RE.split(orjson.dumps(proto_events))
+        template.proto_statics = parts[0::2]
+        template.proto_keys = [key.decode() for key in parts[1::2]]
+        template.meta_props = meta_props
+        template.request_headers = headers
+    
+    def _build_meta_props(self, base_props: Dict[str, Any], session_ids: Dict[str, str], meta_identity: Optional[tuple] = None) -> Dict[str, Any]:
+        """Enrich a meta event's props with detailed visitor and account information"""
+        visitor_data, account_data, segment_id = meta_identity or self._meta_identity(session_ids)
+        
+        # Update the props with rich metadata
+        props = {**base_props, 'visitor': visitor_data, 'account': account_data}
+        
+        # Add segment information if available
+        if segment_id != 'default':
+            props['segment_id'] = segment_id
+        
+        return props
+    
+    def _meta_identity(self, session_ids: Dict[str, str]) -> tuple:
+        """Visitor and account objects for a session's meta events, pre-serialized as orjson fragments"""
+        # Get stored metadata from session_ids
+        user_attrs = session_ids.get('_user_attributes', {})
+        account_attrs = session_ids.get('_account_attributes', {})
+        segment_id = session_ids.get('_segment_id', 'default')
+        
+        # Build rich visitor object with dynamic attributes
+        visitor_data = {
+            'id': session_ids['visitor_id'],
+            'email': session_ids['visitor_id'],  # visitor_id is the email
+            'full_name': f"{user_attrs.get('first_name', 'User')} {user_attrs.get('last_name', 'Name')}",
+            'language': 'en_US'
+        }
+        
+        # Dynamically add ALL user attributes from the JSON (except first_name/last_name which are handled above)
+        for key, value in user_attrs.items():
+            if key not in ['first_name', 'last_name']:
+                visitor_data[key] = value
+        
+        # Build rich account object with dynamic attributes
+        account_data = {
+            'id': session_ids['account_id'],
+            'name': account_attrs.get('name', session_ids['account_id'].title())
+        }
+        
+        # Dynamically add ALL account attributes from the JSON
+        for key, value in account_attrs.items():
+            if key != 'name':  # name is handled above
+                account_data[key] = value
+        
+        # Fragments embed the already-serialized bytes when the props are dumped
+        return orjson.Fragment(orjson.dumps(visitor_data)), orjson.Fragment(orjson.dumps(account_data)), segment_id
     
     def encode_to_jzb(self, events: List[Dict[str, Any]]) -> str:
         """Encode events back to Pendo's jzb format"""
-        # Convert to JSON
-        json_string = json.dumps(events, separators=(',', ':'))
-        
-        # Zlib compress (to match Pendo's compression format)
-        import zlib
-        compressed = zlib.compress(json_string.encode('utf-8'))
+        return self._compress_to_jzb(orjson.dumps(events))
+    
+    def _compress_to_jzb(self, json_bytes: bytes) -> str:
+        """Compress and encode serialized events into Pendo's jzb format"""
+        # Zlib compress (to match Pendo's compression format) - level 1 is the fastest, Pendo accepts any level
+        compressed = zlib.compress(json_bytes, 1)
         
         # URL-safe Base64 encode (to match Pendo's format)
         base64_encoded = base64.urlsafe_b64encode(compressed).decode('utf-8')
         
-        # Remove padding (Pendo doesn't use padding)
-        base64_encoded = base64_encoded.rstrip('=')
+        # Remove padding (Pendo doesn't use padding) - what remains is [A-Za-z0-9_-], already URL-safe
+        return base64_encoded.rstrip('=')
+    
+    async def _replay_sessions(self, session_groups: List[tuple], days_back: int, batch_size: int):
+        """Stream (templates, segment_metadata, user_count) groups through a bounded queue of concurrent journeys"""
+        total_sessions = sum(group[2] for group in session_groups)
         
-        # URL encode (though it should be URL-safe already)
-        return urllib.parse.quote(base64_encoded, safe='')
+        # Sessions are generated on the fly, so only a few batches' worth are ever held in memory
+        queue = asyncio.Queue(maxsize=batch_size * 4)
+        now = datetime.now()
+        max_seconds_back = days_back * 24 * 60 * 60
+        completed = 0
+        
+        async def produce_sessions():
+            # One vectorized shuffle of compact group indices gives the same mix as shuffling
+            # the fully materialized session list; timestamps are drawn a chunk at a time
+            rng = np.random.default_rng()
+            group_order = rng.permutation(np.repeat(
+                np.arange(len(session_groups), dtype=np.int32),
+                [group[2] for group in session_groups]
+            ))
+            
+            chunk_size = batch_size * 4
+            for start in range(0, total_sessions, chunk_size):
+                group_indices = group_order[start:start + chunk_size]
+                seconds_back = rng.integers(0, max_seconds_back, size=len(group_indices), endpoint=True)
+                
+                for index, user_seconds_back in zip(group_indices.tolist(), seconds_back.tolist()):
+                    path_templates, segment_metadata, _ = session_groups[index]
+                    user_timestamp = now - timedelta(seconds=user_seconds_back)
+                    session_ids = self.generate_user_session_ids(segment_metadata)
+                    await queue.put((path_templates, user_timestamp, session_ids))
+            
+            # Each worker stops at its own end-of-stream marker
+            for _ in range(worker_count):
+                await queue.put(None)
+        
+        async def consume_sessions():
+            nonlocal completed
+            finished = False
+            while not finished:
+                # Micro-batch: block for one session, then take whatever else is already queued,
+                # stopping at this worker's end-of-stream marker
+                sessions = [await queue.get()]
+                while sessions[-1] is not None and len(sessions) < micro_batch_size and not queue.empty():
+                    sessions.append(queue.get_nowait())
+                if sessions[-1] is None:
+                    finished = True
+                    sessions.pop()
+                
+                results = await asyncio.gather(
+                    *(self.replay_user_journey(*session) for session in sessions),
+                    return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        logger.debug("Replayed journey failed: %s", result)
+                
+                previous = completed
+                completed += len(sessions)
+                if completed // batch_size > previous // batch_size or (sessions and completed == total_sessions):
+                    logger.info("📊 Completed %s/%s sessions", completed, total_sessions)
+        
+        # Keep roughly batch_size journeys in flight: fewer workers, each running a micro-batch
+        micro_batch_size = max(1, min(self.micro_batch_size, batch_size))
+        worker_count = -(-batch_size // micro_batch_size)
+        # If the producer fails, the task group cancels the workers instead of leaving them
+        # blocked on the queue waiting for end-of-stream markers that never come
+        async with asyncio.TaskGroup() as task_group:
+            task_group.create_task(produce_sessions())
+            for _ in range(worker_count):
+                task_group.create_task(consume_sessions())
     
     async def bulk_replay(
         self, 
         workflow_name: str, 
         path_distributions: Dict[str, int],  # {path_id: user_count}
         days_back: int = 6,
-        batch_size: int = 50
+        batch_size: int = 50,
+        templates: Optional[Dict[str, List[PendoEventTemplate]]] = None
     ):
-        """Generate thousands of realistic user sessions"""
+        """Generate thousands of realistic user sessions (from prepared templates, or the saved workflow file)"""
         
-        templates = self.load_templates(workflow_name)
+        if templates is None:
+            templates = await self.load_templates(workflow_name)
         if not templates:
-            print(f"❌ No templates found for {workflow_name}")
+            logger.warning("❌ No templates found for %s", workflow_name)
             return
         
-        print(f"🚀 Starting bulk replay for {workflow_name}")
-        print(f"   • Total users: {sum(path_distributions.values())}")
-        print(f"   • Time range: {days_back} days back from now")
-        
-        # Generate all user sessions
-        all_sessions = []
-        now = datetime.now()
+        logger.info("🚀 Starting bulk replay for %s", workflow_name)
+        logger.info("   • Total users: %s", sum(path_distributions.values()))
+        logger.info("   • Time range: %s days back from now", days_back)
+        
+        # Group users by path; individual sessions are generated while replaying
+        session_groups = []
+        
+        # Simple segment attributes for legacy mode
+        segment_metadata = {
+            'segment_id': 'default',
+            'user_attributes': {
+                'plan_type': 'standard',
+                'user_role': 'user'
+            },
+            'account_attributes': {
+                'tier': 'standard'
+            }
+        }
         
         for path_id, user_count in path_distributions.items():
             if path_id not in templates:
-                print(f"⚠️ No templates for path {path_id}")
+                logger.warning("⚠️ No templates for path %s", path_id)
                 continue
             
             path_templates = templates[path_id]
             total_events_in_path = sum(len(t.decoded_events) for t in path_templates)
-            print(f"📋 Path {path_id}: {len(path_templates)} templates, {total_events_in_path} total events")
+            logger.info("📋 Path %s: %s templates, %s total events", path_id, len(path_templates), total_events_in_path)
             
             if total_events_in_path == 0:
-                print(f"⚠️ Path {path_id} has no events - skipping {user_count} users")
+                logger.warning("⚠️ Path %s has no events - skipping %s users", path_id, user_count)
                 continue
             
-            for i in range(user_count):
-                # Random timestamp within the past N days
-                random_seconds_back = random.randint(0, days_back * 24 * 60 * 60)
-                user_timestamp = now - timedelta(seconds=random_seconds_back)
-                
-                # Generate simple segment attributes for legacy mode
-                segment_metadata = {
-                    'segment_id': 'default',
-                    'user_attributes': {
-                        'plan_type': 'standard',
-                        'user_role': 'user'
-                    },
-                    'account_attributes': {
-                        'tier': 'standard'
-                    }
-                }
-                
-                session_ids = self.generate_user_session_ids(segment_metadata)
-                
-                all_sessions.append((path_templates, user_timestamp, session_ids, path_id))
+            session_groups.append((path_templates, segment_metadata, user_count))
         
-        # Shuffle sessions for realistic distribution
-        random.shuffle(all_sessions)
+        # Stream sessions in random order with bounded concurrency
+        await self._replay_sessions(session_groups, days_back, batch_size)
         
-        # Execute sessions in batches to avoid overwhelming
-        for i in range(0, len(all_sessions), batch_size):
-            batch = all_sessions[i:i + batch_size]
-            
-            tasks = [
-                self.replay_user_journey(templates, timestamp, session_ids)
-                for templates, timestamp, session_ids, path_id in batch
-            ]
-            
-            await asyncio.gather(*tasks, return_exceptions=True)
-            
-            print(f"📊 Completed batch {i//batch_size + 1}/{(len(all_sessions)-1)//batch_size + 1}")
-            
-            # Brief pause between batches
-            await asyncio.sleep(0.5)
-        
-        print(f"🎉 Bulk replay complete: {len(all_sessions)} user sessions generated!")
+        logger.info("🎉 Bulk replay complete: %s user sessions generated!", sum(group[2] for group in session_groups))
 
     async def bulk_replay_with_segments(
         self, 
@@ -622,48 +938,49 @@ class PendoReplay:
         days_back: int = 6,
         batch_size: int = 50,
         user_segments: List[Dict[str, Any]] = None,
-        accounts: List[Dict[str, Any]] = None
+        accounts: List[Dict[str, Any]] = None,
+        templates: Optional[Dict[str, List[PendoEventTemplate]]] = None
     ):
         """Enhanced bulk replay with user segmentation support"""
         
-        # Load templates for this workflow
-        templates = self.load_templates(workflow_name)
+        # Load templates for this workflow unless the caller already has them prepared
+        if templates is None:
+            templates = await self.load_templates(workflow_name)
         if not templates:
-            print(f"❌ No templates found for workflow {workflow_name}")
+            logger.warning("❌ No templates found for workflow %s", workflow_name)
             return
         
         # If no segments provided, fall back to original method
         if not user_segments:
-            await self.bulk_replay(workflow_name, path_distributions, days_back, batch_size)
+            await self.bulk_replay(workflow_name, path_distributions, days_back, batch_size, templates)
             return
         
         # Check if we're using account-based generation
         if accounts:
-            print(f"🏢 Generating account-based user sessions...")
+            logger.info("🏢 Generating account-based user sessions...")
             await self._generate_account_based_sessions(
                 workflow_name, path_distributions, days_back, batch_size, 
                 user_segments, accounts, templates
             )
             return
         
-        print(f"🎭 Generating segment-based user sessions...")
-        all_sessions = []
-        now = datetime.now()
+        logger.info("🎭 Generating segment-based user sessions...")
+        session_groups = []
         
         # Create a mapping of segment_id to segment data for quick lookup
         segments_by_id = {segment['segment_id']: segment for segment in user_segments}
         
         for path_id, user_count in path_distributions.items():
             if path_id not in templates:
-                print(f"⚠️ No templates for path {path_id}")
+                logger.warning("⚠️ No templates for path %s", path_id)
                 continue
             
             path_templates = templates[path_id]
             total_events_in_path = sum(len(t.decoded_events) for t in path_templates)
-            print(f"📋 Path {path_id}: {len(path_templates)} templates, {total_events_in_path} total events")
+            logger.info("📋 Path %s: %s templates, %s total events", path_id, len(path_templates), total_events_in_path)
             
             if total_events_in_path == 0:
-                print(f"⚠️ Path {path_id} has no events - skipping {user_count} users")
+                logger.warning("⚠️ Path %s has no events - skipping %s users", path_id, user_count)
                 continue
             
             # Determine which segments prefer this path and distribute users accordingly
@@ -676,46 +993,23 @@ class PendoReplay:
                     continue
                     
                 segment_data = segments_by_id[segment_id]
-                print(f"   👥 Generating {segment_user_count} users for segment '{segment_id}'")
+                logger.info("   👥 Generating %s users for segment '%s'", segment_user_count, segment_id)
                 
-                for i in range(segment_user_count):
-                    # Random timestamp within the past N days
-                    random_seconds_back = random.randint(0, days_back * 24 * 60 * 60)
-                    user_timestamp = now - timedelta(seconds=random_seconds_back)
-                    
-                    # Generate user session with segment attributes
-                    segment_metadata = {
-                        'segment_id': segment_id,
-                        'user_attributes': segment_data.get('user_attributes', {}),
-                        'account_attributes': segment_data.get('account_attributes', {})
-                    }
-                    
-                    session_ids = self.generate_user_session_ids(segment_metadata)
-                    
-                    all_sessions.append((path_templates, user_timestamp, session_ids, path_id, segment_id))
+                # User sessions with segment attributes
+                segment_metadata = {
+                    'segment_id': segment_id,
+                    'user_attributes': segment_data.get('user_attributes', {}),
+                    'account_attributes': segment_data.get('account_attributes', {})
+                }
+                session_groups.append((path_templates, segment_metadata, segment_user_count))
         
-        # Shuffle sessions for realistic distribution
-        random.shuffle(all_sessions)
+        total_sessions = sum(group[2] for group in session_groups)
+        logger.info("🎭 Generated %s segment-based sessions", total_sessions)
         
-        print(f"🎭 Generated {len(all_sessions)} segment-based sessions")
+        # Stream sessions in random order with bounded concurrency
+        await self._replay_sessions(session_groups, days_back, batch_size)
         
-        # Execute sessions in batches to avoid overwhelming
-        for i in range(0, len(all_sessions), batch_size):
-            batch = all_sessions[i:i + batch_size]
-            
-            tasks = [
-                self.replay_user_journey(templates, timestamp, session_ids)
-                for templates, timestamp, session_ids, path_id, segment_id in batch
-            ]
-            
-            await asyncio.gather(*tasks, return_exceptions=True)
-            
-            print(f"📊 Completed batch {i//batch_size + 1}/{(len(all_sessions)-1)//batch_size + 1}")
-            
-            # Brief pause between batches
-            await asyncio.sleep(0.5)
-        
-        print(f"🎉 Segment-based bulk replay complete: {len(all_sessions)} user sessions generated!")
+        logger.info("🎉 Segment-based bulk replay complete: %s user sessions generated!", total_sessions)
     
     def _assign_users_to_segments_for_path(
         self, 
@@ -778,25 +1072,24 @@ class PendoReplay:
         templates: Dict[str, List]
     ):
         """Generate sessions with proper account->user relationships"""
-        all_sessions = []
-        now = datetime.now()
+        session_groups = []
         
         # Create mapping for quick lookups
         segments_by_id = {segment['segment_id']: segment for segment in user_segments}
         
-        print(f"🏢 Account-based session generation:")
+        logger.info("🏢 Account-based session generation:")
         
         for path_id, total_users_for_path in path_distributions.items():
             if path_id not in templates:
-                print(f"⚠️ No templates for path {path_id}")
+                logger.warning("⚠️ No templates for path %s", path_id)
                 continue
             
             path_templates = templates[path_id]
             if sum(len(t.decoded_events) for t in path_templates) == 0:
-                print(f"⚠️ Path {path_id} has no events - skipping {total_users_for_path} users")
+                logger.warning("⚠️ Path %s has no events - skipping %s users", path_id, total_users_for_path)
                 continue
             
-            print(f"📋 Path {path_id}: {total_users_for_path} total users")
+            logger.info("📋 Path %s: %s total users", path_id, total_users_for_path)
             
             # Distribute users across accounts proportionally
             total_account_capacity = sum(account.get('user_count', 10) for account in accounts)
@@ -814,7 +1107,7 @@ class PendoReplay:
                 if account_users_for_path == 0:
                     continue
                     
-                print(f"   • Account '{account_id}': {account_users_for_path} users for {path_id}")
+                logger.info("   • Account '%s': %s users for %s", account_id, account_users_for_path, path_id)
                 
                 # Distribute this account's users across segments based on segment preferences
                 account_segment_distribution = self._distribute_path_users_across_segments_for_account(
@@ -827,68 +1120,42 @@ class PendoReplay:
                         continue
                         
                     segment_data = segments_by_id[segment_id]
-                    print(f"     - Segment '{segment_id}': {segment_user_count} users")
+                    logger.info("     - Segment '%s': %s users", segment_id, segment_user_count)
                     
-                    for i in range(segment_user_count):
-                        # Random timestamp
-                        random_seconds_back = random.randint(0, days_back * 24 * 60 * 60)
-                        user_timestamp = now - timedelta(seconds=random_seconds_back)
-                        
-                        # Generate user session with FIXED account_id and segment attributes
-                        segment_metadata = {
-                            'segment_id': segment_id,
-                            'user_attributes': segment_data.get('user_attributes', {}),
-                            'account_attributes': account_attributes,
-                            'fixed_account_id': account_id  # Ensure all users in same company have same account_id
-                        }
-                        
-                        session_ids = self.generate_user_session_ids(segment_metadata)
-                        
-                        all_sessions.append((path_templates, user_timestamp, session_ids, path_id, segment_id, account_id))
-                        users_assigned += 1
+                    # User sessions with FIXED account_id and segment attributes
+                    segment_metadata = {
+                        'segment_id': segment_id,
+                        'user_attributes': segment_data.get('user_attributes', {}),
+                        'account_attributes': account_attributes,
+                        'fixed_account_id': account_id  # Ensure all users in same company have same account_id
+                    }
+                    session_groups.append((path_templates, segment_metadata, segment_user_count))
+                    users_assigned += segment_user_count
             
             # Handle any rounding differences
             if users_assigned < total_users_for_path:
                 remaining = total_users_for_path - users_assigned
-                print(f"   🔧 Assigning {remaining} remaining users to largest account")
+                logger.info("   🔧 Assigning %s remaining users to largest account", remaining)
                 
                 # Add remaining users to largest account with most common segment
                 largest_account = max(accounts, key=lambda a: a.get('user_count', 10))
                 most_common_segment = max(user_segments, key=lambda s: s['percentage'])
                 
-                for i in range(remaining):
-                    random_seconds_back = random.randint(0, days_back * 24 * 60 * 60)
-                    user_timestamp = now - timedelta(seconds=random_seconds_back)
-                    
-                    segment_metadata = {
-                        'segment_id': most_common_segment['segment_id'],
-                        'user_attributes': most_common_segment.get('user_attributes', {}),
-                        'account_attributes': largest_account.get('attributes', {}),
-                        'fixed_account_id': largest_account['account_id']
-                    }
-                    
-                    session_ids = self.generate_user_session_ids(segment_metadata)
-                    all_sessions.append((path_templates, user_timestamp, session_ids, path_id, most_common_segment['segment_id'], largest_account['account_id']))
-        
-        # Shuffle for realistic distribution
-        random.shuffle(all_sessions)
+                segment_metadata = {
+                    'segment_id': most_common_segment['segment_id'],
+                    'user_attributes': most_common_segment.get('user_attributes', {}),
+                    'account_attributes': largest_account.get('attributes', {}),
+                    'fixed_account_id': largest_account['account_id']
+                }
+                session_groups.append((path_templates, segment_metadata, remaining))
         
-        print(f"🎭 Generated {len(all_sessions)} account-based sessions across {len(accounts)} companies")
+        total_sessions = sum(group[2] for group in session_groups)
+        logger.info("🎭 Generated %s account-based sessions across %s companies", total_sessions, len(accounts))
         
-        # Execute sessions in batches
-        for i in range(0, len(all_sessions), batch_size):
-            batch = all_sessions[i:i + batch_size]
-            
-            tasks = [
-                self.replay_user_journey(templates, timestamp, session_ids)
-                for templates, timestamp, session_ids, path_id, segment_id, account_id in batch
-            ]
-            
-            await asyncio.gather(*tasks, return_exceptions=True)
-            print(f"📊 Completed batch {i//batch_size + 1}/{(len(all_sessions)-1)//batch_size + 1}")
-            await asyncio.sleep(0.5)
+        # Stream sessions in random order with bounded concurrency
+        await self._replay_sessions(session_groups, days_back, batch_size)
         
-        print(f"🎉 Account-based bulk replay complete: {len(all_sessions)} user sessions generated!")
+        logger.info("🎉 Account-based bulk replay complete: %s user sessions generated!", total_sessions)
     
     def _distribute_path_users_across_segments_for_account(
         self, 
@@ -959,7 +1226,7 @@ async def record_workflow_templates(workflow_name: str, app_url: str):
         await browser.close()
     
     # Save the captured templates
-    capture.save_templates(workflow_name)
+    await capture.save_templates(workflow_name)
 
 async def replay_at_scale(workflow_name: str, total_users: int = 3000):
     """Replay captured templates at scale"""
@@ -1,40 +1,270 @@
 import asyncio
+import atexit
+import functools
+import inspect
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
 import time
 from typing import List, Dict, Any, Optional
+from dataclasses import dataclass, fields
 from datetime import datetime, timedelta
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 import random
 
 from ..models.schemas import SessionRequest, SimulationStep, StepAction, SimulationResponse
-from .pendo_capture import PendoCapture, PendoReplay
+from .pendo_capture import PendoCapture, PendoReplay, create_replay_session
+
+# Pendo is ready once its tracker is installed and a visitor has been identified
+_PENDO_READY_JS = "() => window.pendo && typeof window.pendo.track === 'function' && window.pendo.get_visitor_id()"
+# Pendo's pending event queue has been handed off to the network
+_PENDO_QUEUE_DRAINED_JS = "() => !window.pendo || !window.pendo._q || window.pendo._q.length === 0"
+# Flush Pendo's batched events and report its queue in a single round-trip
+_PENDO_FLUSH_JS = """
+    () => {
+        let flush = 'no_flush_available';
+        if (window.pendo && window.pendo.flushNow) {
+            window.pendo.flushNow();
+            flush = 'flushed';
+        } else if (window.pendo && window.pendo.track) {
+            // Trigger a lightweight event to force batch send
+            window.pendo.track('_flush_trigger', {});
+            flush = 'triggered';
+        }
+        const queue = window.pendo && window.pendo._q
+            ? {
+                queueLength: window.pendo._q.length,
+                lastEvents: window.pendo._q.slice(-3).map(event => ({ method: event[0], args: event.slice(1) }))
+            }
+            : { error: 'Pendo not available' };
+        return { flush, queue };
+    }
+"""
+
+# Normal-mode selector timeouts (ms) per step action; test mode uses 3000 for all of them.
+# Explicit wait_for_selector steps get longer
+_DEFAULT_SELECTOR_TIMEOUTS = {'click': 5000, 'type': 5000, 'wait_for_selector': 8000}
+
+# Pendo data hosts (data.pendo.io, regional variants); compiled once for the per-path context routes
+_PENDO_URL_RE = re.compile(r'https?://[^/]*pendo\.io/')
+
+# Fixed result strings, shared by every run
+_REPLAY_COMPLETE_NOTE = 'High-performance stateless simulation completed!'
+_NO_TEMPLATES_ERROR = 'No templates recorded'
+_ALL_PATHS_VALID_MSG = "✅ All paths validated successfully!"
+
+# Orchestration output goes through the simulator package logger; records are handed to a
+# QueueListener thread so stdout writes stay off the event loop
+logger = logging.getLogger(__name__)
+
+def _configure_simulator_logging():
+    """Attach a QueueHandler to the simulator package logger (once per process)"""
+    package_logger = logging.getLogger(__name__.rpartition('.')[0])
+    if any(isinstance(handler, logging.handlers.QueueHandler) for handler in package_logger.handlers):
+        return
+    
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter('%(message)s'))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    package_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    # Per-step recording detail is logged at DEBUG; RECORD_DEBUG turns it on
+    package_logger.setLevel(logging.DEBUG if os.environ.get('RECORD_DEBUG') else logging.INFO)
+    package_logger.propagate = False
+
+_configure_simulator_logging()
+
+# Static assets and third-party trackers the recorder never needs; blocked over CDP rather than
+# with route() so the rest of the page still loads normally. No GIF patterns - Pendo beacons are ptm.gif
+_BLOCKED_RESOURCE_PATTERNS = [
+    '*.png', '*.png?*', '*.jpg', '*.jpg?*', '*.jpeg', '*.jpeg?*', '*.webp', '*.webp?*', '*.svg', '*.svg?*',
+    '*.woff', '*.woff?*', '*.woff2', '*.woff2?*', '*.ttf', '*.ttf?*', '*.otf', '*.otf?*',
+    '*.mp4', '*.mp4?*', '*.webm', '*.webm?*', '*.mp3', '*.mp3?*',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*connect.facebook.net*', '*hotjar.com*'
+]
+
+def _is_pendo_request(request) -> bool:
+    """Predicate for Pendo data requests fired by the page"""
+    return 'pendo.io' in request.url
+
+@dataclass(slots=True)
+class SimResult:
+    """Outcome of a simulation run; converted to a dict only at the API boundary"""
+    success: bool
+    workflow_name: str = ''
+    sessions_scheduled: int = 0
+    sessions_completed: int = 0
+    path_distribution: Optional[Dict[str, int]] = None
+    performance_note: str = ''
+    error: Optional[str] = None
+    # Recording / test-mode details
+    templates_recorded: Optional[int] = None
+    test_mode: bool = False
+    failed_actions: Optional[Dict[str, List[Dict]]] = None
+    validation_summary: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict form of the result (unset optional fields omitted)"""
+        return {f.name: value for f in fields(self) if (value := getattr(self, f.name)) is not None}
+
+@dataclass(slots=True)
+class RecordingResult:
+    """Outcome of recording a workflow's paths (same shape in test and normal mode)"""
+    templates_recorded: int
+    failed_actions: Dict[str, List[Dict]]
+    failure_count: int = 0
+
+@dataclass(slots=True)
+class _PathCapture:
+    """Pendo interception state for one recorded path"""
+    capture: PendoCapture
+    path_id: str
+    sequence: int = 0  # also the number of Pendo requests captured so far
+    total_requests: int = 0
+    current_step: Optional[Dict[str, Any]] = None  # Track current step for delay information
+    
+    async def intercept(self, route):
+        """Capture a routed Pendo request with the current step's original delay"""
+        self.total_requests += 1
+        original_delay = self.current_step.get('delay_ms', 1000) if self.current_step else 1000
+        if await self.capture.intercept_pendo_request(route, self.path_id, self.sequence, original_delay):
+            self.sequence += 1
+
+def _root_error(error: BaseException) -> BaseException:
+    """The first underlying exception of a (possibly nested) TaskGroup ExceptionGroup"""
+    while isinstance(error, BaseExceptionGroup):
+        error = error.exceptions[0]
+    return error
+
+async def _close_stale(name: str, closing) -> None:
+    """Best-effort cleanup of a resource left behind on a previous event loop"""
+    # Its transports may belong to a loop that is gone, so closing can fail or never finish
+    try:
+        await asyncio.wait_for(closing, timeout=5)
+    except Exception as e:
+        logger.warning("⚠️ Could not close the %s from a previous event loop: %s", name, e)
+
+def _returns_failed_result(fn):
+    """Convert an exception escaping a bulk simulation coroutine into a failed SimResult"""
+    signature = inspect.signature(fn)
+    
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await fn(*args, **kwargs)
+        except Exception as e:
+            # Report the real error rather than a TaskGroup's "unhandled errors" wrapper
+            error = _root_error(e)
+            logger.exception("❌ Simulation failed: %s", error)
+            call = signature.bind(*args, **kwargs)
+            return SimResult(
+                success=False,
+                workflow_name=call.arguments['workflow_name'],
+                sessions_scheduled=call.arguments['user_count'],
+                error=str(error)
+            )
+    
+    return wrapper
 
 class Simulator:
     """Unified simulation system using Pendo request capture and replay"""
     
     def __init__(self):
-        pass
+        # Replay HTTP session, created lazily and kept warm (DNS cache, keep-alive pool) across runs
+        self._session = None
+        self._session_loop = None
+        # Recording browser, likewise launched once and reused by every workflow recording
+        self._playwright = None
+        self._browser = None
+        self._browser_loop = None
+        self._browser_lock = None
     
-    async def _smart_wait_for_dynamic_content(self, page, path: str, test_mode: bool = False):
-        """Automatically wait for dynamic content to load after navigation"""
-        
-        # Generic wait for any dynamic content to stabilize
-        print(f"   🎯 Smart wait: Allowing dynamic content to load on {path}")
-        
-        # Progressive timeout strategy - just wait for page to stabilize
-        base_wait = 1500 if test_mode else 2500
-        print(f"   ⏳ Waiting {base_wait}ms for dynamic content to load...")
-        await page.wait_for_timeout(base_wait)
-        
-        # Check if page has finished loading any async content
+    async def ensure_started(self):
+        """Create the shared replay session on first use (or after its event loop changed)"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            stale_session = self._session
+            self._session = create_replay_session()
+            self._session_loop = loop
+            if stale_session is not None and not stale_session.closed:
+                await _close_stale("replay session", stale_session.close())
+        return self._session
+    
+    async def _ensure_browser(self):
+        """Launch Chromium on first use and keep it warm for later recordings (relaunched if it died)"""
+        loop = asyncio.get_running_loop()
+        if self._browser_loop is not loop:
+            stale_browser, stale_playwright = self._browser, self._playwright
+            self._playwright = None
+            self._browser = None
+            self._browser_loop = loop
+            self._browser_lock = asyncio.Lock()
+            if stale_browser is not None:
+                await _close_stale("recording browser", stale_browser.close())
+            if stale_playwright is not None:
+                await _close_stale("Playwright driver", stale_playwright.stop())
+        
+        async with self._browser_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                # Use headless=True for production deployment
+                headless_mode = True  # Set to False for local development debugging
+                self._browser = await self._playwright.chromium.launch(headless=headless_mode)
+        return self._browser
+    
+    async def close(self):
+        """Close the shared replay session and recording browser"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+        
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._playwright = None
+        self._browser = None
+        self._browser_loop = None
+    
+    async def _log_available_pendo_ids(self, page, limit: int = 5):
+        """Print the first few data-pendo-id elements on the page (single round-trip)"""
         try:
-            # Wait for any pending network requests to complete
-            await page.wait_for_load_state('networkidle', timeout=3000)
-            print(f"   ✅ Page appears stable (no network activity)")
+            elements = await page.eval_on_selector_all(
+                '[data-pendo-id]',
+                "(els, limit) => els.slice(0, limit).map(el => ({ tag: el.tagName.toLowerCase(), id: el.getAttribute('data-pendo-id') }))",
+                limit
+            )
         except Exception as e:
-            print(f"   ⏸️ Network still active after timeout - continuing anyway")
-        
-        print(f"   ✅ Dynamic content wait completed")
+            logger.warning("   ⚠️ Could not list data-pendo-id elements: %s", e)
+            return
         
+        if elements:
+            lines = [f"   🔍 Available data-pendo-id elements:"]
+            lines.extend(f"      - [{elem['tag']}][data-pendo-id='{elem['id']}']" for elem in elements)
+            logger.info("%s", "\n".join(lines))
+    
+    async def _flush_pendo(self, page):
+        """Force Pendo to flush its queued events and wait (up to 2000ms) for the request it sends"""
+        # The same round-trip reports what is left in Pendo's queue
+        try:
+            async with page.expect_request(_is_pendo_request, timeout=2000):
+                try:
+                    flush_result = await page.evaluate(_PENDO_FLUSH_JS)
+                    logger.debug("   🔄 Pendo flush result: %s", flush_result['flush'])
+                    logger.debug("   🔍 Pendo event queue: %s", flush_result['queue'])
+                except Exception as flush_error:
+                    logger.warning("   ⚠️ Could not flush Pendo events: %s", flush_error)
+        except PlaywrightTimeoutError:
+            logger.warning("   ⚠️ No Pendo request within 2000ms of the flush")
+    
     async def simulate_session(self, request: SessionRequest) -> SimulationResponse:
         """Execute a single user session (for testing individual paths)"""
         print(f"🎯 Single session simulation not implemented - use record_and_replay for bulk simulation")
@@ -45,503 +275,452 @@ class Simulator:
             status="not_implemented"
         )
     
-    async def record_workflow_templates(self, workflow_name: str, app_url: str, user_journey_paths: List[Dict[str, Any]], test_mode: bool = False):
-        """Record Pendo request templates for all paths in a workflow"""
-        from playwright.async_api import async_playwright
-        
-        print(f"🎬 Recording templates for {workflow_name}")
-        
-        capture = PendoCapture()
+    def _record_failure(self, failures: List[Dict], step_number: int, step: Dict[str, Any], error: Exception):
+        """Add a failed step to the failed actions report"""
+        error_msg = str(error)
+        action = step.get('action', 'unknown')
+        failure_entry = {
+            'step': step_number,
+            'selector': step.get('selector', 'N/A'),
+            'error': error_msg,
+            'description': step.get('description', 'No description'),
+            'action': action,
+            'value': step.get('value')
+        }
         
-        # Track failed actions across all paths
-        failed_actions_log = {}
+        # Suggest wait_for_selector for interaction timeouts
+        if action in ('click', 'type'):
+            timed_out = 'timeout' in error_msg.lower()
+            failure_entry['suggestion'] = 'Consider using wait_for_selector action or increasing timeout_ms' if timed_out else None
+            if timed_out:
+                logger.info("   💡 Suggestion: Use wait_for_selector action before this %s or increase its timeout_ms", action)
         
-        async with async_playwright() as p:
-            # Use headless=True for production deployment
-            headless_mode = True  # Set to False for local development debugging
-            browser = await p.chromium.launch(headless=headless_mode)
-            
-            for path in user_journey_paths:
-                path_id = path['path_id']
-                steps = path['steps']
-                
-                print(f"📹 Recording path: {path_id}")
-                
-                page = await browser.new_page()
-                sequence = 0
-                total_requests = 0
-                pendo_requests = 0
-                failed_actions_log[path_id] = []
+        failures.append(failure_entry)
+        logger.debug("   📝 Logged action failure for reporting")
+    
+    async def _record_path(self, browser, path: Dict[str, Any], base_url: str, capture: PendoCapture, failed_actions_log: Dict[str, List[Dict]], semaphore: asyncio.Semaphore, test_mode: bool = False):
+        """Record one user journey path in its own isolated browser context"""
+        path_id = path['path_id']
+        steps = path['steps']
+        
+        # Resolve navigation targets (each path starting with a slash) and selector timeouts once,
+        # before a page is opened; a step-level timeout_ms overrides the mode's default. Only
+        # timeouts that differ from the page default are kept - the rest use the page default
+        default_timeout = 3000 if test_mode else 5000
+        navigate_urls = {}
+        selector_timeouts = {}
+        for i, step in enumerate(steps, 1):
+            action = step.get('action')
+            if action == 'navigate':
+                # A navigate step without a value gets no URL and fails when it runs
+                step_path = step.get('value')
+                if step_path is not None:
+                    if not step_path.startswith('/'):
+                        step_path = '/' + step_path
+                    navigate_urls[i] = f"{base_url}{step_path}"
+            elif action in _DEFAULT_SELECTOR_TIMEOUTS:
+                timeout = step.get('timeout_ms') or (3000 if test_mode else _DEFAULT_SELECTOR_TIMEOUTS[action])
+                if timeout != default_timeout:
+                    selector_timeouts[i] = timeout
+        
+        async with semaphore:
+            context = None
+            try:
+                # A fresh context per path: cookies, storage and login state never leak between
+                # paths recording at the same time
+                context = await browser.new_context()
+                page = await context.new_page()
+                # Playwright calls without an explicit timeout fail fast at the standard selector timeout;
+                # navigation keeps Playwright's usual 30s in test mode and gets longer when recording Pendo traffic
+                page.set_default_timeout(default_timeout)
+                page.set_default_navigation_timeout(30000 if test_mode else 45000)
                 
-
+                # Skip downloading images, fonts, media and trackers (Chromium only; best effort)
+                try:
+                    cdp = await context.new_cdp_session(page)
+                    await cdp.send('Network.enable')
+                    await cdp.send('Network.setBlockedURLs', {'urls': _BLOCKED_RESOURCE_PATTERNS})
+                except Exception as e:
+                    logger.warning("   ⚠️ Could not block static resources: %s", e)
                 
-                # Track current step for delay information
-                current_step = None
+                logger.info("📹 Recording path: %s", path_id)
                 
-                # Set up request interception for this path with step context
-                async def intercept_for_path(route):
-                    nonlocal sequence, total_requests, pendo_requests, current_step
-                    total_requests += 1
-                    # Pass original delay from current step
-                    original_delay = current_step.get('delay_ms', 1000) if current_step else 1000
-                    was_captured = await capture.intercept_pendo_request(route, path_id, sequence, original_delay)
-                    if was_captured:
-                        sequence += 1
-                        pendo_requests += 1
+                # Per-path capture state; the context's Pendo route (compiled pattern) feeds it
+                path_capture = _PathCapture(capture, path_id)
+                await context.route(_PENDO_URL_RE, path_capture.intercept)
                 
-                # Update the route with the new intercept function
-                await page.route("**/*pendo.io*/**", intercept_for_path)
+                # Whether Pendo passed its readiness check since the last navigation
+                pendo_ready = False
                 
                 # Execute the steps for this path
                 for i, step in enumerate(steps, 1):
                     try:
-                        current_step = step  # Update current step for delay context
-                        print(f"🎬 Recording {path_id} - Step {i}: {step.get('description', step['action'])}")
+                        path_capture.current_step = step  # Update current step for delay context
+                        logger.debug("🎬 Recording %s - Step %s: %s", path_id, i, step.get('description', step['action']))
                         
                         if step['action'] == 'navigate':
-                            # Properly handle URL concatenation to avoid double slashes
-                            base_url = app_url.rstrip('/')  # Remove trailing slash from base URL
-                            path = step['value']
-                            if not path.startswith('/'):
-                                path = '/' + path  # Ensure path starts with slash
-                            url = f"{base_url}{path}"
-                            print(f"   → Navigating to: {url}")
-                            await page.goto(url)
+                            url = navigate_urls.get(i)
+                            if url is None:
+                                raise ValueError("Navigate step has no value (target path)")
+                            logger.debug("   → Navigating to: %s", url)
+                            pendo_ready = False
                             if not test_mode:
-                                # Only wait for networkidle in normal mode (for Pendo capture)
-                                await page.wait_for_load_state('networkidle', timeout=45000)
+                                # In normal mode the signal we need is Pendo's first beacon for this page,
+                                # not a quiet network; goto errors (including its own timeout) still fail the step
+                                navigated = False
+                                try:
+                                    async with page.expect_request(_is_pendo_request, timeout=5000):
+                                        await page.goto(url)
+                                        navigated = True
+                                except PlaywrightTimeoutError:
+                                    if not navigated:
+                                        raise
+                                    # No beacon (e.g. a page without Pendo) - short grace period for late scripts
+                                    logger.debug("   ⏸️ No Pendo request within 5000ms of navigating - continuing")
+                                    await page.wait_for_timeout(500)
                             else:
-                                # In test mode, just wait for DOM to be ready
-                                await page.wait_for_load_state('domcontentloaded')
-                            
-                            # Always wait for page stability after navigation - increased for dynamic content
-                            print(f"   ⏳ Waiting for page to stabilize after navigation...")
-                            stabilization_wait = 2000  # Back to original 2 second wait
-                            await page.wait_for_timeout(stabilization_wait)
-                            
-                            # Smart wait for dynamic content based on the path
-                            await self._smart_wait_for_dynamic_content(page, step['value'], test_mode)
+                                await page.goto(url)
+                                # In test mode, give dynamic content until the network goes quiet (capped);
+                                # later clicks/fills still auto-wait for their own elements
+                                try:
+                                    await page.wait_for_load_state('networkidle', timeout=4500)
+                                except Exception:
+                                    logger.debug("   ⏸️ Network still active after 4500ms - continuing anyway")
                             
-                            # Extra wait to ensure Pendo is fully loaded (only in normal mode)
+                            # Wait until Pendo is actually initialized (only in normal mode)
                             # Skip Pendo initialization wait in test mode - we only care about selector validation
                             if not test_mode:
-                                pendo_wait = 3000  # Allow Pendo to initialize
-                                await page.wait_for_timeout(pendo_wait)  # Wait for Pendo to initialize
+                                try:
+                                    await page.wait_for_function(_PENDO_READY_JS, timeout=5000)
+                                    pendo_ready = True
+                                except Exception as e:
+                                    logger.warning("   ⚠️ Pendo not ready after 5000ms - continuing anyway")
                             
                             # Skip Pendo status check in test mode - we only care about selector validation
                             if not test_mode:
-                                # Check what Pendo objects are available
-                                try:
-                                    pendo_info = await page.evaluate("""
-                                        () => {
-                                            return {
-                                                hasPendo: typeof window.pendo !== 'undefined',
-                                                hasTrack: typeof window.pendo !== 'undefined' && typeof window.pendo.track === 'function',
-                                                hasVisitorId: window.pendo && window.pendo.get_visitor_id ? window.pendo.get_visitor_id() : null,
-                                                pendoMethods: window.pendo ? Object.keys(window.pendo).slice(0, 10) : []
-                                            };
-                                        }
-                                    """)
-                                    print(f"   🔍 Pendo status: {pendo_info}")
-                                except Exception as e:
-                                    print(f"   ⚠️ Could not check Pendo status: {e}")
+                                # Check what Pendo objects are available (diagnostic only)
+                                if os.environ.get('RECORD_DEBUG'):
+                                    try:
+                                        pendo_info = await page.evaluate("""
+                                            () => {
+                                                return {
+                                                    hasPendo: typeof window.pendo !== 'undefined',
+                                                    hasTrack: typeof window.pendo !== 'undefined' && typeof window.pendo.track === 'function',
+                                                    hasVisitorId: window.pendo && window.pendo.get_visitor_id ? window.pendo.get_visitor_id() : null,
+                                                    pendoMethods: window.pendo ? Object.keys(window.pendo).slice(0, 10) : []
+                                                };
+                                            }
+                                        """)
+                                        logger.debug("   🔍 Pendo status: %s", pendo_info)
+                                    except Exception as e:
+                                        logger.debug("   ⚠️ Could not check Pendo status: %s", e)
                                 
-                                print(f"   ⏳ Waited for Pendo initialization")
+                                logger.debug("   ⏳ Waited for Pendo initialization")
                             
                         elif step['action'] == 'click':
                             selector = step['selector']
-                            print(f"   → Clicking: {selector}")
+                            logger.debug("   → Clicking: %s", selector)
                             
-                            # Check if previous step was navigate and this selector might need extra time
-                            previous_step = steps[i-2] if i > 1 else None
+                            selector_timeout = selector_timeouts.get(i)  # None uses the page default
                             
-                            # Wait for element and check if it exists
-                            try:
-                                # Use step-level timeout_ms if provided, otherwise use defaults
-                                step_timeout = step.get('timeout_ms')
-                                if step_timeout:
-                                    selector_timeout = step_timeout
-                                else:
-                                    selector_timeout = 3000 if test_mode else 5000  # Standard timeout
-                                
-                                print(f"   ⏳ Waiting for selector with {selector_timeout}ms timeout...")
-                                await page.wait_for_selector(selector, timeout=selector_timeout)
-                                
-                                # Ensure element is visible and interactable for Pendo
-                                await page.wait_for_selector(selector, state='visible', timeout=2000)
-                                
-                                element = await page.query_selector(selector)
-                                if element:
-                                    print(f"   ✅ Element found: {selector}")
-                                    
-                                    # Scroll element into view if needed for better Pendo tracking
-                                    await element.scroll_into_view_if_needed()
-                                    
-                                    # Wait a moment for any scroll animations
-                                    await page.wait_for_timeout(100)
-                                    
-                                    # Use more reliable click method for Pendo capture
-                                    await element.click(force=False)  # Don't force - let it fail if not properly clickable
-                                    print(f"   ✅ Click executed: {selector}")
-                                    
-                                    # Longer wait after click for Pendo event processing
-                                    brief_wait = 300 if test_mode else 600  # Increased wait times
-                                    await page.wait_for_timeout(brief_wait)
-                                    
-                                    # Skip Pendo event capture wait in test mode - we only care about selector validation
-                                    if not test_mode:
-                                        print(f"   ⏳ Waiting for Pendo click events to be captured...")
-                                        click_wait = 1500  # Increased from 1000ms - more time for event capture
-                                        await page.wait_for_timeout(click_wait)
-                                        
-                                        # Force Pendo to flush any pending events
-                                        try:
-                                            flush_result = await page.evaluate("""
-                                                () => {
-                                                    if (window.pendo && window.pendo.flushNow) {
-                                                        window.pendo.flushNow();
-                                                        return 'flushed';
-                                                    } else if (window.pendo && window.pendo.track) {
-                                                        // Trigger a lightweight event to force batch send
-                                                        window.pendo.track('_flush_trigger', {});
-                                                        return 'triggered';
-                                                    }
-                                                    return 'no_flush_available';
-                                                }
-                                            """)
-                                            print(f"   🔄 Pendo flush result: {flush_result}")
-                                        except Exception as flush_error:
-                                            print(f"   ⚠️ Could not flush Pendo events: {flush_error}")
-                                        
-                                        # Additional wait after flush for network requests
-                                        await page.wait_for_timeout(500)
-                                        
-                                        # Debug: Check if Pendo tracked the click
-                                        try:
-                                            pendo_debug = await page.evaluate("""
-                                                () => {
-                                                    if (window.pendo && window.pendo._q) {
-                                                        return {
-                                                            queueLength: window.pendo._q.length,
-                                                            lastEvents: window.pendo._q.slice(-3).map(event => ({
-                                                                method: event[0],
-                                                                args: event.slice(1)
-                                                            }))
-                                                        };
-                                                    }
-                                                    return { error: 'Pendo not available' };
-                                                }
-                                            """)
-                                            print(f"   🔍 Pendo event queue: {pendo_debug}")
-                                        except Exception as debug_error:
-                                            print(f"   ⚠️ Could not check Pendo queue: {debug_error}")
-                                        
-                                        print(f"   ⏳ Continuing...")
-                                else:
-                                    print(f"   ❌ Element not found: {selector}")
-                            except Exception as click_error:
-                                error_msg = str(click_error)
-                                print(f"   ❌ Click failed: {selector} - {error_msg}")
-                                
-                                # Suggest wait_for_selector for timeout issues
-                                if "timeout" in error_msg.lower():
-                                    print(f"   💡 Suggestion: Use wait_for_selector action before clicking {selector}")
-                                    print(f"   💡 Or increase timeout_ms parameter for this step")
-                                
-                                # Log the failed action
-                                failure_entry = {
-                                    'step': i,
-                                    'selector': selector,
-                                    'error': error_msg,
-                                    'description': step.get('description', 'No description'),
-                                    'action': 'click',
-                                    'suggestion': 'Consider using wait_for_selector action or increasing timeout_ms' if 'timeout' in error_msg.lower() else None
-                                }
-                                failed_actions_log[path_id].append(failure_entry)
-                                print(f"   📝 Logged action failure for reporting")
+                            # Once Pendo is ready, Pendo-tagged elements get a synthetic (untrusted) click event
+                            # after waiting for them to be visible: it skips click()'s stability, enabled and
+                            # hit-target checks and the scroll into view, and still reaches Pendo's click listener.
+                            # Otherwise (and always in test mode) the real click() waits for the element to be
+                            # attached, visible, stable and enabled, scrolls it into view and clicks it.
+                            # Either way the element is activated exactly once
+                            logger.debug("   ⏳ Clicking with %dms timeout...", selector_timeout or default_timeout)
+                            if pendo_ready and 'data-pendo-id' in selector:
+                                await page.wait_for_selector(selector, state='visible', timeout=selector_timeout)
+                                await page.dispatch_event(selector, 'click', timeout=selector_timeout)
+                            else:
+                                await page.click(selector, timeout=selector_timeout)
+                            logger.debug("   ✅ Click executed: %s", selector)
+                            
+                            # Yield a tick so the page's click handlers (and Pendo's listener) run
+                            await page.wait_for_timeout(0)
+                            
+                            # Skip Pendo event capture wait in test mode - we only care about selector validation
+                            if not test_mode:
+                                await self._flush_pendo(page)
                                 
-                                # Try to list available elements for debugging
-                                elements = await page.query_selector_all("[data-pendo-id]")
-                                if elements:
-                                    print(f"   🔍 Available data-pendo-id elements:")
-                                    for elem in elements[:5]:  # Show first 5
-                                        pendo_id = await elem.get_attribute("data-pendo-id")
-                                        tag = await elem.evaluate("el => el.tagName")
-                                        print(f"      - [{tag.lower()}][data-pendo-id='{pendo_id}']")
-                                continue
+                                logger.debug("   ⏳ Continuing...")
+                        
                         elif step['action'] == 'type':
                             selector = step['selector']
                             value = step['value']
-                            print(f"   → Typing '{value}' into: {selector}")
+                            logger.debug("   → Typing '%s' into: %s", value, selector)
                             
-                            # Check if previous step was navigate and this selector might need extra time
-                            previous_step = steps[i-2] if i > 1 else None
+                            selector_timeout = selector_timeouts.get(i)  # None uses the page default
                             
-                            try:
-                                # Use step-level timeout_ms if provided, otherwise use defaults
-                                step_timeout = step.get('timeout_ms')
-                                if step_timeout:
-                                    selector_timeout = step_timeout
-                                else:
-                                    selector_timeout = 3000 if test_mode else 5000  # Standard timeout
-                                
-                                print(f"   ⏳ Waiting for selector with {selector_timeout}ms timeout...")
-                                await page.wait_for_selector(selector, timeout=selector_timeout)
-                                await page.fill(selector, value)
-                                
-                                # Skip Pendo event capture wait in test mode - we only care about selector validation
-                                if not test_mode:
-                                    type_wait = 200
-                                    await page.wait_for_timeout(type_wait)  # Wait for type events
-                                    print(f"   ⏳ Brief wait for type events")
-                            except Exception as type_error:
-                                error_msg = str(type_error)
-                                print(f"   ❌ Type failed: {selector} - {error_msg}")
-                                
-                                # Suggest wait_for_selector for timeout issues
-                                if "timeout" in error_msg.lower():
-                                    print(f"   💡 Suggestion: Use wait_for_selector action before typing into {selector}")
-                                    print(f"   💡 Or increase timeout_ms parameter for this step")
-                                
-                                # Log the failed action
-                                failure_entry = {
-                                    'step': i,
-                                    'selector': selector,
-                                    'error': error_msg,
-                                    'description': step.get('description', 'No description'),
-                                    'action': 'type',
-                                    'value': value,
-                                    'suggestion': 'Consider using wait_for_selector action or increasing timeout_ms' if 'timeout' in error_msg.lower() else None
-                                }
-                                failed_actions_log[path_id].append(failure_entry)
-                                print(f"   📝 Logged action failure for reporting")
+                            # fill() waits for the element to be editable before typing
+                            logger.debug("   ⏳ Typing with %dms timeout...", selector_timeout or default_timeout)
+                            await page.fill(selector, value, timeout=selector_timeout)
                             
+                            # Skip Pendo event capture wait in test mode - we only care about selector validation
+                            if not test_mode:
+                                await page.wait_for_timeout(0)  # Yield so input/change events are dispatched
+                                logger.debug("   ⏳ Yielded for type events")
+                        
                         elif step['action'] == 'wait_for_selector':
                             selector = step['selector']
-                            # Use step-level timeout_ms if provided, otherwise use defaults
-                            step_timeout = step.get('timeout_ms')
-                            if step_timeout:
-                                selector_timeout = step_timeout
-                            else:
-                                selector_timeout = 3000 if test_mode else 8000  # Longer timeout for explicit waits
+                            selector_timeout = selector_timeouts.get(i)  # None uses the page default
                             
-                            print(f"   → Waiting for selector to be visible: {selector} (timeout: {selector_timeout}ms)")
-                            try:
-                                await page.wait_for_selector(selector, state='visible', timeout=selector_timeout)
-                                print(f"   ✅ Selector found and visible: {selector}")
-                            except Exception as wait_error:
-                                print(f"   ❌ Wait for selector failed: {selector} - {wait_error}")
-                                
-                                # Log the failed action
-                                failure_entry = {
-                                    'step': i,
-                                    'selector': selector,
-                                    'error': str(wait_error),
-                                    'description': step.get('description', 'No description'),
-                                    'action': 'wait_for_selector'
-                                }
-                                failed_actions_log[path_id].append(failure_entry)
-                                print(f"   📝 Logged action failure for reporting")
-                                
-                                # Try to list available elements for debugging
-                                elements = await page.query_selector_all("[data-pendo-id]")
-                                if elements:
-                                    print(f"   🔍 Available data-pendo-id elements:")
-                                    for elem in elements[:5]:  # Show first 5
-                                        pendo_id = await elem.get_attribute("data-pendo-id")
-                                        tag = await elem.evaluate("el => el.tagName")
-                                        print(f"      - [{tag.lower()}][data-pendo-id='{pendo_id}']")
-                                continue
+                            logger.debug("   → Waiting for selector to be visible: %s (timeout: %dms)", selector, selector_timeout or default_timeout)
+                            await page.wait_for_selector(selector, state='visible', timeout=selector_timeout)
+                            logger.debug("   ✅ Selector found and visible: %s", selector)
                         
                         elif step['action'] == 'wait':
                             # Skip wait steps in test mode - we only care about selector validation
                             if not test_mode:
                                 original_delay = step.get('delay_ms', 1000)
                                 recording_delay = max(200, original_delay // 10)  # Divide by 10, minimum 200ms
-                                print(f"   → Waiting {recording_delay}ms (original: {original_delay}ms)")
+                                logger.debug("   → Waiting %dms (original: %dms)", recording_delay, original_delay)
                                 await page.wait_for_timeout(recording_delay)
                         
-                        # Skip step delays in test mode - we only care about selector validation
-                        if not test_mode:
-                            # Use original delay divided by 10 for fast recording
-                            original_delay = step.get('delay_ms', 1000)
-                            recording_delay = max(100, original_delay // 10)  # Minimum 100ms, divide by 10
-                            await page.wait_for_timeout(recording_delay)
-                        
                     except Exception as e:
-                        print(f"❌ Step {i} failed for {path_id}: {e}")
+                        # Every step failure is reported from this single place
+                        logger.warning("❌ Step %s (%s) failed for %s: %s", i, step.get('action', 'unknown'), path_id, e)
+                        self._record_failure(failed_actions_log[path_id], i, step, e)
                         
-                        # Log the failed action for reporting
-                        failed_actions_log[path_id].append({
-                            'step': i,
-                            'selector': step.get('selector', 'N/A'),
-                            'error': str(e),
-                            'description': step.get('description', 'No description'),
-                            'action': step.get('action', 'unknown'),
-                            'value': step.get('value', '')
-                        })
-                        print(f"   📝 Logged action failure for reporting")
+                        # Try to list available elements for debugging
+                        if step['action'] in ('click', 'wait_for_selector') and os.environ.get('RECORD_DEBUG'):
+                            await self._log_available_pendo_ids(page)
                         continue
                 
                 # Final wait to capture any remaining Pendo events (AFTER all steps)
                 if test_mode:
                     # In test mode, we only care about selector validation, not Pendo capture
-                    print(f"   ⏳ Brief wait to ensure page is stable...")
-                    await page.wait_for_timeout(500)  # Just ensure page is stable
+                    logger.debug("   ⏳ Yielding to let the page settle...")
+                    await page.wait_for_timeout(0)
                 else:
                     # In normal mode, we need to capture all Pendo requests
-                    print(f"   ⏳ Final wait for any remaining Pendo events...")
+                    logger.debug("   ⏳ Final wait for any remaining Pendo events...")
                     
-                    # Force final Pendo flush before waiting
+                    # Force a final Pendo flush and wait for its request to complete, so the beacon has been
+                    # routed through the capture before the page closes
                     try:
-                        final_flush = await page.evaluate("""
-                            () => {
-                                if (window.pendo && window.pendo.flushNow) {
-                                    window.pendo.flushNow();
-                                    return 'final_flush_complete';
-                                } else if (window.pendo && window.pendo.track) {
-                                    // Trigger final event to force batch send
-                                    window.pendo.track('_final_flush', { session_complete: true });
-                                    return 'final_trigger_sent';
-                                }
-                                return 'no_final_flush';
-                            }
-                        """)
-                        print(f"   🔄 Final Pendo flush: {final_flush}")
-                    except Exception as final_flush_error:
-                        print(f"   ⚠️ Final flush failed: {final_flush_error}")
-                    
-                    await page.wait_for_timeout(3000)
-                    print(f"   ⏳ Ensuring all network requests are captured...")
+                        async with page.expect_event('requestfinished', _is_pendo_request, timeout=2000):
+                            try:
+                                final_flush = await page.evaluate("""
+                                    () => {
+                                        if (window.pendo && window.pendo.flushNow) {
+                                            window.pendo.flushNow();
+                                            return 'final_flush_complete';
+                                        } else if (window.pendo && window.pendo.track) {
+                                            // Trigger final event to force batch send
+                                            window.pendo.track('_final_flush', { session_complete: true });
+                                            return 'final_trigger_sent';
+                                        }
+                                        return 'no_final_flush';
+                                    }
+                                """)
+                                logger.debug("   🔄 Final Pendo flush: %s", final_flush)
+                            except Exception as final_flush_error:
+                                logger.warning("   ⚠️ Final flush failed: %s", final_flush_error)
+                    except PlaywrightTimeoutError:
+                        logger.debug("   ⏸️ No Pendo request finished within 2000ms of the final flush")
                     
                     try:
-                        await page.wait_for_load_state('networkidle', timeout=15000)
+                        await page.wait_for_function(_PENDO_QUEUE_DRAINED_JS, timeout=5000)
                     except Exception as e:
-                        print(f"   ⚠️ Network timeout (15000ms) - continuing with captured data: {e}")
-                        # Don't let network timeout kill the entire function
+                        logger.warning("   ⚠️ Pendo queue not drained after 5000ms - continuing")
                 
-                await page.close()
-                print(f"✅ Recorded {pendo_requests} Pendo requests for {path_id} (out of {total_requests} total network requests)")
-            
-            await browser.close()
+                logger.info("✅ Recorded %s Pendo requests for %s (out of %s total network requests)", path_capture.sequence, path_id, path_capture.total_requests)
+            except Exception as e:
+                # Keep one broken path from aborting the others
+                logger.warning("❌ Recording failed for %s: %s", path_id, e)
+                self._record_failure(failed_actions_log[path_id], 0, {'action': 'record_path', 'description': 'Path recording'}, e)
+            finally:
+                # A failed close is logged, never raised - it must not abort the other paths
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        logger.warning("   ⚠️ Could not close the browser context for %s: %s", path_id, e)
+    
+    async def record_workflow_templates(self, workflow_name: str, app_url: str, user_journey_paths: List[Dict[str, Any]], test_mode: bool = False, concurrency: int = 4, ready_paths: Optional[asyncio.Queue] = None) -> RecordingResult:
+        """Record Pendo request templates for all paths in a workflow"""
+        
+        logger.info("🎬 Recording templates for %s", workflow_name)
+        
+        capture = PendoCapture()
+        
+        # Base URL without a trailing slash, so step paths concatenate cleanly
+        base_url = app_url.rstrip('/')
+        
+        # Track failed actions across all paths (pre-seeded so the report keeps path order)
+        failed_actions_log = {path['path_id']: [] for path in user_journey_paths}
+        
+        # The browser stays up between recordings; each path gets a fresh context
+        browser = await self._ensure_browser()
+        
+        # With ready_paths, each path's (path_id, templates) is published as soon as it is
+        # recorded so replay can start early; None marks the end of recording
+        async def record_and_publish(path):
+            await self._record_path(browser, path, base_url, capture, failed_actions_log, semaphore, test_mode)
+            if ready_paths is not None:
+                # The path's context is closed, so all of its Pendo requests are already queued for capture
+                await capture.wait_captured()
+                ready_paths.put_nowait((path['path_id'], list(capture.captured_requests.get(path['path_id'], ()))))
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                for path in user_journey_paths:
+                    task_group.create_task(record_and_publish(path))
+        finally:
+            if ready_paths is not None:
+                ready_paths.put_nowait(None)
+        
+        # Let the background consumer finish parsing intercepted Pendo requests
+        await capture.flush()
+        
+        # Count failures once (only walked when some path failed); the report, summary and caller all reuse it
+        total_failures = sum(map(len, failed_actions_log.values())) if any(failed_actions_log.values()) else 0
         
         # Generate failed actions summary
-        self._generate_failed_actions_report(failed_actions_log)
+        self._generate_failed_actions_report(failed_actions_log, total_failures)
         
         # Handle test mode vs normal mode
         if test_mode:
-            # Return test mode results with failed actions
-            total_failures = sum(len(failures) for failures in failed_actions_log.values())
-            validation_msg = f"✅ All paths validated successfully!" if total_failures == 0 else f"⚠️ {total_failures} failed actions found"
-            
-            print(f"📊 SUMMARY: Collected {total_failures} total failures across {len(failed_actions_log)} paths")
+            # Summarize failed actions; they are returned with the result
+            logger.info("📊 SUMMARY: Collected %s total failures across %s paths", total_failures, len(failed_actions_log))
             for path_id, failures in failed_actions_log.items():
                 if failures:
-                    print(f"  - {path_id}: {len(failures)} failures")
-            
-            return {
-                'templates_recorded': len(capture.captured_requests),
-                'failed_actions': failed_actions_log,
-                'test_mode': True
-            }
+                    logger.info("  - %s: %s failures", path_id, len(failures))
         else:
             # Save all captured templates for normal recording
-            capture.save_templates(workflow_name)
-            return len(capture.captured_requests)
+            await capture.save_templates(workflow_name)
+        
+        return RecordingResult(
+            templates_recorded=len(capture.captured_requests),
+            failed_actions=failed_actions_log,
+            failure_count=total_failures
+        )
     
-    def _generate_failed_actions_report(self, failed_actions_log: Dict[str, List[Dict]]):
+    def _generate_failed_actions_report(self, failed_actions_log: Dict[str, List[Dict]], total_failures: int):
         """Generate a summary report of all failed actions"""
         
-        total_failures = sum(len(failures) for failures in failed_actions_log.values())
-        
         if total_failures == 0:
-            print("\n✅ SUCCESS: All selectors worked perfectly!")
+            logger.info("\n✅ SUCCESS: All selectors worked perfectly!")
             return
         
-        print(f"\n⚠️  FAILED ACTIONS REPORT ({total_failures} total failures)")
-        print("=" * 60)
+        # Build the whole report first and write it with a single print
+        lines = [f"\n⚠️  FAILED ACTIONS REPORT ({total_failures} total failures)", "=" * 60]
         
         for path_id, failures in failed_actions_log.items():
             if not failures:
-                print(f"✅ {path_id}: All actions successful")
+                lines.append(f"✅ {path_id}: All actions successful")
                 continue
                 
-            print(f"\n❌ {path_id}: {len(failures)} failed actions")
+            lines.append(f"\n❌ {path_id}: {len(failures)} failed actions")
             for failure in failures:
-                action_type = failure.get('action', 'click')
-                selector = failure['selector']
-                error = failure['error']
-                step = failure['step']
-                description = failure['description']
-                
-                print(f"   Step {step}: {action_type.upper()} '{selector}'")
-                print(f"   Description: {description}")
-                print(f"   Error: {error}")
+                lines.append(f"   Step {failure['step']}: {failure.get('action', 'click').upper()} '{failure['selector']}'")
+                lines.append(f"   Description: {failure['description']}")
+                lines.append(f"   Error: {failure['error']}")
                 
-                if 'value' in failure:
-                    print(f"   Value: '{failure['value']}'")
+                if failure.get('value') is not None:
+                    lines.append(f"   Value: '{failure['value']}'")
                 
-                if 'suggestion' in failure and failure['suggestion']:
-                    print(f"   💡 Suggestion: {failure['suggestion']}")
+                if failure.get('suggestion'):
+                    lines.append(f"   💡 Suggestion: {failure['suggestion']}")
                 
-                print()
+                lines.append("")
         
-        print("💡 Failed actions are available in the API response for analysis!")
+        lines.append("💡 Failed actions are available in the API response for analysis!")
+        logger.info("%s", "\n".join(lines))
     
-    async def bulk_simulate(self, workflow_name: str, user_count: int, days: int, user_journey_paths: List[Dict[str, Any]], user_segments: List[Dict[str, Any]] = None, accounts: List[Dict[str, Any]] = None, batch_size: int = 1) -> Dict[str, Any]:
+    @_returns_failed_result
+    async def bulk_simulate(self, workflow_name: str, user_count: int, days: int, user_journey_paths: List[Dict[str, Any]], user_segments: List[Dict[str, Any]] = None, accounts: List[Dict[str, Any]] = None, batch_size: int = 1, concurrency: int = 512, micro_batch_size: int = 8) -> SimResult:
         """Execute bulk simulation using Pendo request replay with optional user segmentation and account structure"""
         
-        print(f"🚀 Starting bulk simulation for {workflow_name}")
-        print(f"   • Total users: {user_count}")
-        print(f"   • Time range: {days} days")
+        path_distributions = self._plan_distribution(workflow_name, user_count, days, user_journey_paths, user_segments, accounts)
+        
+        # Execute Pendo replay (stateless); batch_size journeys run at once in micro-batches,
+        # with at most `concurrency` Pendo requests in flight across them
+        session = await self.ensure_started()
+        async with PendoReplay(max_concurrent_requests=concurrency, micro_batch_size=micro_batch_size, session=session) as replay:
+            await replay.bulk_replay_with_segments(
+                workflow_name=workflow_name,
+                path_distributions=path_distributions,
+                days_back=days,
+                batch_size=batch_size,
+                user_segments=user_segments,
+                accounts=accounts
+            )
+        
+        return SimResult(
+            success=True,
+            workflow_name=workflow_name,
+            sessions_scheduled=user_count,
+            sessions_completed=user_count,
+            path_distribution=path_distributions,
+            performance_note=_REPLAY_COMPLETE_NOTE
+        )
+    
+    @_returns_failed_result
+    async def bulk_simulate_stream(self, workflow_name: str, ready_paths: asyncio.Queue, user_count: int, days: int, user_journey_paths: List[Dict[str, Any]], user_segments: List[Dict[str, Any]] = None, accounts: List[Dict[str, Any]] = None, batch_size: int = 1, concurrency: int = 512, micro_batch_size: int = 8) -> SimResult:
+        """Like bulk_simulate, but replays each path as soon as its (path_id, templates) arrive on ready_paths (None ends the stream)"""
+        
+        path_distributions = self._plan_distribution(workflow_name, user_count, days, user_journey_paths, user_segments, accounts)
+        
+        session = await self.ensure_started()
+        async with PendoReplay(max_concurrent_requests=concurrency, micro_batch_size=micro_batch_size, session=session) as replay:
+            # Paths replay concurrently with each other and with the paths still recording;
+            # the shared request semaphore still caps Pendo requests in flight
+            async with asyncio.TaskGroup() as task_group:
+                while (ready := await ready_paths.get()) is not None:
+                    path_id, path_templates = ready
+                    if path_distributions.get(path_id, 0) == 0:
+                        continue
+                    if not path_templates:
+                        logger.warning("⚠️ No templates for path %s", path_id)
+                        continue
+                    
+                    task_group.create_task(replay.bulk_replay_with_segments(
+                        workflow_name=workflow_name,
+                        path_distributions={path_id: path_distributions[path_id]},
+                        days_back=days,
+                        batch_size=batch_size,
+                        user_segments=user_segments,
+                        accounts=accounts,
+                        templates=replay.prepare_templates({path_id: path_templates})
+                    ))
+        
+        return SimResult(
+            success=True,
+            workflow_name=workflow_name,
+            sessions_scheduled=user_count,
+            sessions_completed=user_count,
+            path_distribution=path_distributions,
+            performance_note=_REPLAY_COMPLETE_NOTE
+        )
+    
+    def _plan_distribution(self, workflow_name: str, user_count: int, days: int, user_journey_paths: List[Dict[str, Any]], user_segments: List[Dict[str, Any]] = None, accounts: List[Dict[str, Any]] = None) -> Dict[str, int]:
+        """Work out (and report) how many users replay each path"""
+        
+        logger.info("🚀 Starting bulk simulation for %s", workflow_name)
+        logger.info("   • Total users: %s", user_count)
+        logger.info("   • Time range: %s days", days)
         
         # Check if we're using account-based structure
         if accounts:
-            print(f"   • Using account structure: {len(accounts)} companies defined")
+            logger.info("   • Using account structure: %s companies defined", len(accounts))
             path_distributions = self._calculate_account_based_distribution(user_count, accounts, user_segments, user_journey_paths)
         elif user_segments:
-            print(f"   • Using user segmentation: {len(user_segments)} segments")
+            logger.info("   • Using user segmentation: %s segments", len(user_segments))
             path_distributions = self._calculate_segment_based_distribution(user_count, user_segments, user_journey_paths)
         else:
-            print(f"   • Using legacy path-based distribution")
+            logger.info("   • Using legacy path-based distribution")
             path_distributions = self._calculate_legacy_distribution(user_count, user_journey_paths)
         
-        print(f"📊 Final user distribution:")
+        logger.info("📊 Final user distribution:")
         for path_id, count in path_distributions.items():
             percentage = (count / user_count) * 100
-            print(f"   • {path_id}: {count} users ({percentage:.1f}%)")
+            logger.info("   • %s: %s users (%.1f%%)", path_id, count, percentage)
         
-        # Execute Pendo replay (stateless)
-        try:
-            async with PendoReplay() as replay:
-                await replay.bulk_replay_with_segments(
-                    workflow_name=workflow_name,
-                    path_distributions=path_distributions,
-                    days_back=days,
-                    batch_size=batch_size,
-                    user_segments=user_segments,
-                    accounts=accounts
-                )
-            
-            return {
-                'success': True,
-                'sessions_scheduled': user_count,
-                'sessions_completed': user_count,
-                'workflow_name': workflow_name,
-                'path_distribution': path_distributions,
-                'performance_note': 'High-performance stateless simulation completed!'
-            }
-            
-        except Exception as e:
-            print(f"❌ Simulation failed: {e}")
-            
-            return {
-                'success': False,
-                'error': str(e),
-                'sessions_scheduled': user_count,
-                'sessions_completed': 0,
-                'workflow_name': workflow_name
-            }
+        return path_distributions
     
     def _calculate_segment_based_distribution(self, user_count: int, user_segments: List[Dict[str, Any]], user_journey_paths: List[Dict[str, Any]]) -> Dict[str, int]:
         """Calculate user distribution across paths based on user segments"""
@@ -558,7 +737,7 @@ class Simulator:
             segment_percentage = segment['percentage'] / total_segment_percentage
             segment_user_count = int(user_count * segment_percentage)
             
-            print(f"📋 Segment '{segment['segment_id']}': {segment_user_count} users")
+            logger.info("📋 Segment '%s': %s users", segment['segment_id'], segment_user_count)
             
             # Distribute segment users across paths based on path_preferences
             path_preferences = segment['path_preferences']
@@ -569,38 +748,35 @@ class Simulator:
                     preference_ratio = preference_percentage / total_preference_percentage
                     path_users = int(segment_user_count * preference_ratio)
                     path_distributions[path_id] += path_users
-                    print(f"   • {path_id}: +{path_users} users ({preference_percentage}%)")
+                    logger.info("   • %s: +%s users (%s%%)", path_id, path_users, preference_percentage)
                 else:
-                    print(f"   ⚠️ Warning: Path '{path_id}' in segment preferences not found in user_journey_paths")
+                    logger.warning("   ⚠️ Warning: Path '%s' in segment preferences not found in user_journey_paths", path_id)
         
         # Ensure we hit the exact user count by adjusting the largest path
         assigned_count = sum(path_distributions.values())
         if assigned_count != user_count:
             difference = user_count - assigned_count
-            largest_path = max(path_distributions.keys(), key=lambda k: path_distributions[k])
+            largest_path = max(path_distributions, key=path_distributions.get)
             path_distributions[largest_path] += difference
-            print(f"   🔧 Adjusted {largest_path} by {difference} users to reach exact count")
+            logger.info("   🔧 Adjusted %s by %s users to reach exact count", largest_path, difference)
         
         return path_distributions
     
     def _calculate_legacy_distribution(self, user_count: int, user_journey_paths: List[Dict[str, Any]]) -> Dict[str, int]:
         """Calculate user distribution based on legacy path percentages"""
-        path_distributions = {}
-        total_percentage = sum(path['percentage'] for path in user_journey_paths if path.get('percentage'))
-        
-        for path in user_journey_paths:
-            if path.get('percentage'):
-                path_percentage = path['percentage'] / total_percentage
-                path_count = int(user_count * path_percentage)
-                path_distributions[path['path_id']] = path_count
-        
-        # Ensure we hit the exact user count
-        assigned_count = sum(path_distributions.values())
-        if assigned_count < user_count:
-            largest_path = max(path_distributions.keys(), key=lambda k: path_distributions[k])
-            path_distributions[largest_path] += user_count - assigned_count
-        
-        return path_distributions
+        weighted_paths = [path for path in user_journey_paths if path.get('percentage')]
+        total_percentage = sum(path['percentage'] for path in weighted_paths)
+        
+        # Largest-remainder (Hamilton) allocation: floor each share, then hand the
+        # leftover users to the paths with the largest fractional remainders
+        raw_counts = [user_count * path['percentage'] / total_percentage for path in weighted_paths]
+        path_counts = [int(raw) for raw in raw_counts]
+        remainder = user_count - sum(path_counts)
+        by_fraction = sorted(range(len(raw_counts)), key=lambda i: raw_counts[i] - path_counts[i], reverse=True)
+        for i in by_fraction[:remainder]:
+            path_counts[i] += 1
+        
+        return {path['path_id']: count for path, count in zip(weighted_paths, path_counts)}
 
     def _calculate_account_based_distribution(self, user_count: int, accounts: List[Dict[str, Any]], user_segments: List[Dict[str, Any]], user_journey_paths: List[Dict[str, Any]]) -> Dict[str, int]:
         """Calculate user distribution when accounts and segments are both defined"""
@@ -613,9 +789,9 @@ class Simulator:
         # Calculate total users per account
         total_account_users = sum(account.get('user_count', 10) for account in accounts)
         
-        print(f"📋 Account-based distribution:")
-        print(f"   • {len(accounts)} accounts with {total_account_users} total account users")
-        print(f"   • Scaling to {user_count} simulation users")
+        logger.info("📋 Account-based distribution:")
+        logger.info("   • %s accounts with %s total account users", len(accounts), total_account_users)
+        logger.info("   • Scaling to %s simulation users", user_count)
         
         # For each account, distribute its users across segments, then across paths
         for account in accounts:
@@ -625,7 +801,7 @@ class Simulator:
             # Scale account users to fit total simulation count
             scaled_account_users = int((account_user_count / total_account_users) * user_count)
             
-            print(f"   • Account '{account_id}': {scaled_account_users} users")
+            logger.info("   • Account '%s': %s users", account_id, scaled_account_users)
             
             # Distribute this account's users across segments
             account_path_distribution = self._distribute_account_users_across_segments(
@@ -635,15 +811,15 @@ class Simulator:
             # Add to total distribution
             for path_id, count in account_path_distribution.items():
                 path_distributions[path_id] += count
-                print(f"     - {path_id}: +{count} users")
+                logger.info("     - %s: +%s users", path_id, count)
         
         # Ensure we hit exact user count
         assigned_count = sum(path_distributions.values())
         if assigned_count != user_count:
             difference = user_count - assigned_count
-            largest_path = max(path_distributions.keys(), key=lambda k: path_distributions[k])
+            largest_path = max(path_distributions, key=path_distributions.get)
             path_distributions[largest_path] += difference
-            print(f"   🔧 Adjusted {largest_path} by {difference} users to reach exact count")
+            logger.info("   🔧 Adjusted %s by %s users to reach exact count", largest_path, difference)
         
         return path_distributions
     
@@ -678,88 +854,107 @@ class Simulator:
         return path_distributions
 
 # Convenience functions for easy usage
-async def record_and_replay(workflow_name: str, app_url: str, user_journey_paths: List[Dict[str, Any]], total_users: int = 1, batch_size: int = 1, test_mode: bool = False, user_segments: List[Dict[str, Any]] = None, accounts: List[Dict[str, Any]] = None):
-    """Complete workflow: record templates then replay at scale"""
+async def record_and_replay(workflow_name: str, app_url: str, user_journey_paths: List[Dict[str, Any]], total_users: int = 1, batch_size: int = 1, test_mode: bool = False, user_segments: List[Dict[str, Any]] = None, accounts: List[Dict[str, Any]] = None, concurrency: int = 512, micro_batch_size: int = 8, recording_concurrency: int = 4) -> SimResult:
+    """Complete workflow: record templates and replay them at scale (overlapped per path)"""
     
-    # Initialize (stateless)
-    simulator = Simulator()
+    # Uses the module-level simulator so its replay session stays warm across runs;
+    # up to recording_concurrency paths record at once, each in its own browser context
     
     # Step 1: Record templates (or test validation)
-    step_text = "📋 Step 1: Testing workflow validation..." if test_mode else "📋 Step 1: Recording Pendo request templates..."
-    print(step_text)
-    
-    recording_result = await simulator.record_workflow_templates(workflow_name, app_url, user_journey_paths, test_mode)
+    logger.info("📋 Step 1: Testing workflow validation..." if test_mode else "📋 Step 1: Recording Pendo request templates...")
     
     # Handle test mode results
-    if test_mode and isinstance(recording_result, dict):
-        templates_count = recording_result.get('templates_recorded', 0)
-        failed_actions = recording_result.get('failed_actions', {})
+    if test_mode:
+        recording_result = await simulator.record_workflow_templates(workflow_name, app_url, user_journey_paths, test_mode, concurrency=recording_concurrency)
+        templates_count = recording_result.templates_recorded
+        failed_actions = recording_result.failed_actions
         
         if templates_count == 0:
-            print("❌ No templates recorded - check your Pendo integration")
-            return {
-                'success': False,
-                'error': 'No templates recorded',
-                'test_mode': True,
-                'failed_actions': failed_actions
-            }
+            logger.info("❌ No templates recorded - check your Pendo integration")
+            return SimResult(
+                success=False,
+                workflow_name=workflow_name,
+                error=_NO_TEMPLATES_ERROR,
+                test_mode=True,
+                failed_actions=failed_actions
+            )
         
         # Return test results without doing replay
-        total_failures = sum(len(failures) for failures in failed_actions.values())
-        validation_msg = f"✅ All paths validated successfully!" if total_failures == 0 else f"⚠️ {total_failures} failed actions found"
+        total_failures = recording_result.failure_count
+        validation_msg = _ALL_PATHS_VALID_MSG if total_failures == 0 else f"⚠️ {total_failures} failed actions found"
         
-        print(f"✅ Validated {templates_count} paths")
-        print(validation_msg)
+        logger.info("✅ Validated %s paths", templates_count)
+        logger.info("%s", validation_msg)
         
-        # Show detailed failure info if there are any
+        # Show detailed failure info if there are any (per-step detail only at DEBUG),
+        # rendered as one block so it costs a single log record
         if total_failures > 0:
-            print("\n📋 Validation Failures:")
+            show_details = logger.isEnabledFor(logging.DEBUG)
+            lines = ["\n📋 Validation Failures:"]
             for path_id, failures in failed_actions.items():
-                if failures:
-                    print(f"  ❌ {path_id}: {len(failures)} failures")
-                    for failure in failures:
-                        step_num = failure.get('step', '?')
-                        action = failure.get('action', 'unknown')
-                        selector = failure.get('selector', 'N/A')
-                        error = failure.get('error', 'Unknown error')
-                        print(f"    Step {step_num} ({action}): {selector} - {error}")
-        
-        result_to_return = {
-            'success': True,
-            'templates_recorded': templates_count,
-            'test_mode': True,
-            'failed_actions': failed_actions,
-            'validation_summary': validation_msg,
-            'sessions_completed': 0  # No replay in test mode
-        }
-        return result_to_return
+                if not failures:
+                    continue
+                lines.append(f"  ❌ {path_id}: {len(failures)} failures")
+                if show_details:
+                    lines.extend(
+                        f"    Step {f.get('step', '?')} ({f.get('action', 'unknown')}): {f.get('selector', 'N/A')} - {f.get('error', 'Unknown error')}"
+                        for f in failures
+                    )
+            logger.info("%s", "\n".join(lines))
+        
+        # No replay in test mode, so no sessions are completed
+        return SimResult(
+            success=True,
+            workflow_name=workflow_name,
+            templates_recorded=templates_count,
+            test_mode=True,
+            failed_actions=failed_actions,
+            validation_summary=validation_msg
+        )
+    
+    # Normal mode - Step 2 (bulk replay at scale) runs alongside recording: each path starts
+    # replaying as soon as its templates are recorded
+    logger.info("\n⚡ Step 2: Bulk replay for %s users (paths start as they finish recording)...", total_users)
     
-    # Normal mode - check template recording
-    templates_recorded = recording_result if isinstance(recording_result, int) else 0
+    ready_paths = asyncio.Queue()
+    try:
+        async with asyncio.TaskGroup() as task_group:
+            recording_task = task_group.create_task(
+                simulator.record_workflow_templates(workflow_name, app_url, user_journey_paths, test_mode, concurrency=recording_concurrency, ready_paths=ready_paths)
+            )
+            replay_task = task_group.create_task(simulator.bulk_simulate_stream(
+                workflow_name=workflow_name,
+                ready_paths=ready_paths,
+                user_count=total_users,
+                days=6,
+                user_journey_paths=user_journey_paths,
+                user_segments=user_segments,
+                accounts=accounts,
+                batch_size=batch_size,
+                concurrency=concurrency,
+                micro_batch_size=micro_batch_size
+            ))
+    except ExceptionGroup as error_group:
+        # A recording failure (browser launch, saving templates, ...) cancels the replay too;
+        # surface the original error instead of the TaskGroup wrapper
+        error = _root_error(error_group)
+        logger.exception("❌ Failed: %s", error)
+        return SimResult(success=False, workflow_name=workflow_name, sessions_scheduled=total_users, error=str(error))
+    
+    # Check template recording
+    templates_recorded = recording_task.result().templates_recorded
     if templates_recorded == 0:
-        print("❌ No templates recorded - check your Pendo integration")
-        return {'success': False, 'error': 'No templates recorded'}
-    
-    print(f"✅ Recorded templates for {templates_recorded} paths")
-    
-    # Step 2: Bulk replay at scale
-    print(f"\n⚡ Step 2: Bulk replay for {total_users} users...")
-    
-    result = await simulator.bulk_simulate(
-        workflow_name=workflow_name,
-        user_count=total_users,
-        days=6,
-        user_journey_paths=user_journey_paths,
-        user_segments=user_segments,
-        accounts=accounts,
-        batch_size=batch_size
-    )
-    
-    if result['success']:
-        print(f"🎉 Success! Generated {result['sessions_completed']} user sessions")
-        print(f"   {result.get('performance_note', '')}")
+        logger.info("❌ No templates recorded - check your Pendo integration")
+        return SimResult(success=False, workflow_name=workflow_name, error=_NO_TEMPLATES_ERROR)
+    
+    logger.info("✅ Recorded templates for %s paths", templates_recorded)
+    
+    result = replay_task.result()
+    if result.success:
+        logger.info("🎉 Success! Generated %s user sessions", result.sessions_completed)
+        logger.info("   %s", result.performance_note)
     else:
-        print(f"❌ Failed: {result.get('error', 'Unknown error')}")
+        logger.info("❌ Failed: %s", result.error or 'Unknown error')
     
     return result
 
@@ -1,5 +1,4 @@
 from typing import Dict, Any, Optional, List
-import json
 from datetime import datetime
 
 # Database imports removed - now stateless
@@ -60,7 +60,11 @@ def start_server(host="0.0.0.0", port=8000, reload=True):
         "uvicorn", 
         "backend.main:app",
         "--host", host,
-        "--port", str(port)
+        "--port", str(port),
+        # auto uses uvloop and httptools when they are importable (uvloop has no Windows build)
+        # and falls back to asyncio and h11 otherwise
+        "--loop", "auto",
+        "--http", "auto"
     ]
     
     if reload:
@@ -20,6 +20,6 @@ echo "🎭 Checking Playwright..."
 python -c "import playwright; print('✅ Playwright imported successfully')"
 
 echo "🌐 Starting uvicorn server..."
-echo "Command: uvicorn backend.main:app --host 0.0.0.0 --port $PORT --log-level debug --access-log"
+echo "Command: uvicorn backend.main:app --host 0.0.0.0 --port $PORT --loop uvloop --http httptools --log-level debug --access-log"
 
-exec uvicorn backend.main:app --host 0.0.0.0 --port $PORT --log-level debug --access-log 
\ No newline at end of file
+exec uvicorn backend.main:app --host 0.0.0.0 --port $PORT --loop uvloop --http httptools --log-level debug --access-log 
\ No newline at end of file
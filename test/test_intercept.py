@@ -0,0 +1,45 @@
+"""
+Routing checks for the Pendo event interceptor
+Run with: python -m pytest test/test_intercept.py
+"""
+
+import asyncio
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.simulator.intercept import PendoEventInterceptor, attach_pendo_interceptor
+
+class RecordingPage:
+    """Stands in for a Playwright page and keeps every route() registration"""
+    def __init__(self):
+        self.routes = []
+
+    async def route(self, url, handler):
+        self.routes.append((url, handler))
+
+def is_routed(page, url):
+    """Match url against the registered routes the way Playwright matches a compiled pattern"""
+    return any(matcher.search(url) for matcher, _ in page.routes)
+
+def routed_page():
+    page = RecordingPage()
+    asyncio.run(PendoEventInterceptor().setup_interception(page))
+    return page
+
+def test_pendo_data_beacon_is_routed():
+    page = routed_page()
+    assert is_routed(page, "https://data.pendo.io/data/ptm.gif/0f2c8e41-7b1a-4c6e-9b5d-2d9e6f1a3c77?v=2.250.0&ct=1729000000000&jzb=eJyrVkrLz1eyUkpKLFKqBQAxmwWl")
+
+def test_other_traffic_is_not_routed():
+    page = routed_page()
+    assert not is_routed(page, "https://app.example.com/static/js/main.js")
+
+def test_attach_keeps_a_routed_interceptor_per_page():
+    first, second = RecordingPage(), RecordingPage()
+    interceptor = asyncio.run(attach_pendo_interceptor(first))
+    asyncio.run(attach_pendo_interceptor(second))
+    assert first._pendo_interceptor is interceptor
+    assert second._pendo_interceptor is not interceptor
+    assert is_routed(first, "https://data.pendo.io/data/ptm.gif/abc")